@@ -0,0 +1,67 @@
+"""Benchmark config_dir scanning of a large mounted volume.
+
+Usage: poetry run python benchmarks/bench_config_dir.py [--files 5000]
+"""
+
+import argparse
+import os
+import pathlib
+import tempfile
+import time
+
+from configmap_reader import config_dir
+
+
+def full_read(path: str) -> dict:
+    """Reference implementation: read every file on every call."""
+    result = {}
+    for p in pathlib.Path(path).iterdir():
+        if p.is_file():
+            try:
+                result[p.name] = p.read_text(encoding="utf-8")
+            except UnicodeDecodeError:
+                continue
+    return result
+
+
+def timed(label: str, func, repeat: int) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    print(f"{label:<40} {elapsed:10.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        payload = "x" * args.size
+        for i in range(args.files):
+            with open(os.path.join(root, f"key-{i}"), "w") as f:
+                f.write(payload)
+
+        print(f"{args.files} files of {args.size} bytes")
+        timed("full read (iterdir + read_text)", lambda: full_read(root),
+              args.repeat)
+
+        config_dir._scan_cache.clear()
+        timed("scan, cold cache", lambda: config_dir.scan(root), 1)
+        timed("scan, nothing changed", lambda: config_dir.scan(root),
+              args.repeat)
+
+        def change_some():
+            for i in range(0, args.files, 100):
+                with open(os.path.join(root, f"key-{i}"), "a") as f:
+                    f.write("y")
+            return config_dir.scan(root)
+
+        timed("scan, 1% of files changed", change_some, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Benchmark HTTP/2 cleartext (h2c) against HTTP/1.1 for polling clients.
+
+Concurrent pollers share one client per protocol: over HTTP/1.1 every
+in-flight request needs its own connection, over h2c they are multiplexed
+as streams. Reports the server's established connections (read from
+/proc/net/tcp, Linux only) and the request latency percentiles.
+
+Requires the http2 extra for the server and httpx[http2], part of the dev
+dependencies, for the client.
+
+Usage: poetry install -E http2
+       poetry run python benchmarks/bench_http2.py [--pollers 500]
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def established(port: int) -> int:
+    """Count established connections accepted on a local port."""
+    count = 0
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                lines = f.readlines()[1:]
+        except OSError:
+            continue
+        for line in lines:
+            fields = line.split()
+            local_port = int(fields[1].rsplit(":", 1)[1], 16)
+            if local_port == port and fields[3] == "01":
+                count += 1
+    return count
+
+
+def start_server(http2: bool, port: int, env: dict) -> subprocess.Popen:
+    env = dict(env, PORT=str(port))
+    if http2:
+        code = "from configmap_reader import main; main.run(http2=True)"
+        command = [sys.executable, "-c", code]
+    else:
+        command = [
+            sys.executable, "-m", "uvicorn", "configmap_reader.main:app",
+            "--port", str(port), "--log-level", "warning",
+        ]
+    process = subprocess.Popen(command, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.05)
+    process.terminate()
+    raise RuntimeError("server did not start")
+
+
+async def poll(client, rounds: int, interval: float, latencies: list):
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.get("/config")
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+        await asyncio.sleep(interval)
+
+
+async def load(http2: bool, port: int, args) -> tuple:
+    limits = httpx.Limits(
+        max_connections=args.pollers, max_keepalive_connections=args.pollers
+    )
+    latencies = []
+    peak = 0
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{port}",
+        http1=not http2,
+        http2=http2,
+        limits=limits,
+        timeout=30,
+    ) as client:
+        tasks = [
+            asyncio.create_task(
+                poll(client, args.rounds, args.interval, latencies)
+            )
+            for _ in range(args.pollers)
+        ]
+        while not all(task.done() for task in tasks):
+            peak = max(peak, established(port))
+            await asyncio.sleep(0.05)
+        await asyncio.gather(*tasks)
+    return peak, sorted(latencies)
+
+
+def percentile(values: list, p: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pollers", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        for name, value in (("statusCode", "200"), ("body", '{"a": 1}')):
+            with open(os.path.join(root, name), "w") as f:
+                f.write(value)
+        env = dict(os.environ, CONFIG_DIR=root, READ_MODE="volume")
+
+        print(f"{args.pollers} pollers x {args.rounds} requests")
+        print(
+            f"{'':<10} {'connections':>12} {'p50 (ms)':>10} {'p99 (ms)':>10}"
+        )
+        for label, http2 in (("HTTP/1.1", False), ("h2c", True)):
+            port = free_port()
+            process = start_server(http2, port, env)
+            try:
+                peak, latencies = asyncio.run(load(http2, port, args))
+            finally:
+                process.terminate()
+                process.wait()
+            print(
+                f"{label:<10} {peak:12d} "
+                f"{percentile(latencies, 0.5):10.2f} "
+                f"{percentile(latencies, 0.99):10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""Benchmark import time and CLI start to the first served /config.
+
+Fails with exit code 1 when a budget is exceeded or when a module that the
+read mode doesn't need gets imported.
+
+Usage: poetry run python benchmarks/bench_startup.py [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from configmap_reader.fake_apiserver import FakeApiServer
+
+# Modules that must not be loaded by an import of the package entry points
+FORBIDDEN = {
+    "cli --help": ["fastapi", "uvicorn", "configmap_reader.main"],
+    "volume": ["configmap_reader.config_api", "kubernetes", "uvicorn"],
+    "api": ["configmap_reader.config_dir", "uvicorn"],
+}
+
+CLI_HELP = (
+    "import sys\n"
+    "sys.argv = ['configmap-reader', '--help']\n"
+    "from configmap_reader import cli\n"
+    "try:\n"
+    "    cli.run()\n"
+    "except SystemExit:\n"
+    "    pass\n"
+)
+IMPORT_MAIN = "import configmap_reader.main\n"
+REPORT = (
+    "import json, sys\n"
+    "print(json.dumps(sorted(sys.modules)), file=sys.stderr)\n"
+)
+
+KUBECONFIG = """apiVersion: v1
+kind: Config
+clusters:
+- name: fake
+  cluster:
+    server: {url}
+contexts:
+- name: fake
+  context:
+    cluster: fake
+    user: fake
+current-context: fake
+users:
+- name: fake
+  user:
+    token: fake
+"""
+
+
+def import_time(code: str, env: dict) -> tuple:
+    """Return the -X importtime total in ms and the loaded modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code + REPORT],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    lines = result.stderr.splitlines()
+    modules = json.loads(lines[-1])
+    total_us = 0
+    for line in lines:
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Only top-level imports, nested ones are part of their cumulative
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_config(env: dict, timeout: float = 30) -> float:
+    """Start the configmap-reader CLI and return ms until /config is 200."""
+    command = shutil.which("configmap-reader")
+    if command is None:
+        raise RuntimeError("configmap-reader is not installed")
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/config"
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [command],
+        env=dict(env, PORT=str(port)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"/config not served within {timeout}s")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--cli-import-budget-ms", type=float, default=150)
+    parser.add_argument("--import-budget-ms", type=float, default=800)
+    parser.add_argument("--startup-budget-ms", type=float, default=2000)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as root, FakeApiServer() as fake:
+        config = os.path.join(root, "config")
+        os.mkdir(config)
+        for name, value in (("statusCode", "200"), ("body", '{"a": 1}')):
+            with open(os.path.join(config, name), "w") as f:
+                f.write(value)
+        fake.set_configmap(
+            "default", "bench", {"statusCode": "200", "body": '{"a": 1}'}
+        )
+        kubeconfig = os.path.join(root, "kubeconfig")
+        with open(kubeconfig, "w") as f:
+            f.write(KUBECONFIG.format(url=fake.url))
+
+        base = dict(os.environ, CONFIG_DIR=config)
+        envs = {
+            "cli --help": base,
+            "volume": dict(base, READ_MODE="volume"),
+            "api": dict(
+                base,
+                READ_MODE="api",
+                CONFIGMAP_NAME="bench",
+                NAMESPACE="default",
+                KUBECONFIG=kubeconfig,
+            ),
+        }
+
+        print(f"{'':<12} {'import (ms)':>12} {'first /config (ms)':>20}")
+        for label, env in envs.items():
+            code = CLI_HELP if label == "cli --help" else IMPORT_MAIN
+            runs = [import_time(code, env) for _ in range(args.repeat)]
+            imported = statistics.median(ms for ms, _ in runs)
+            loaded = [m for m in FORBIDDEN[label] if m in runs[0][1]]
+            if loaded:
+                failures.append(f"{label}: imports {', '.join(loaded)}")
+
+            if label == "cli --help":
+                startup = None
+                budget = args.cli_import_budget_ms
+            else:
+                startup = statistics.median(
+                    time_to_first_config(env) for _ in range(args.repeat)
+                )
+                budget = args.import_budget_ms
+                if startup > args.startup_budget_ms:
+                    failures.append(
+                        f"{label}: first /config after {startup:.0f} ms, "
+                        f"budget {args.startup_budget_ms:.0f} ms"
+                    )
+            if imported > budget:
+                failures.append(
+                    f"{label}: imports take {imported:.0f} ms, "
+                    f"budget {budget:.0f} ms"
+                )
+            first = f"{startup:20.1f}" if startup is not None else f"{'-':>20}"
+            print(f"{label:<12} {imported:12.1f} {first}")
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Non-blocking, sampled access logging.
+
+Requests only push a record onto a bounded queue; a background thread
+writes them as JSON lines. When the queue is full, records are dropped and
+counted instead of blocking the event loop.
+"""
+
+import json
+import queue
+import random
+import sys
+import threading
+import time
+
+from . import metrics
+
+_STOP = object()
+
+
+class AccessLogger:
+    """Write access records from a background thread.
+
+    Args:
+        stream: File object the JSON lines are written to
+        queue_size: Maximum number of records waiting to be written
+        sample_rate: Share of normal requests logged, 0.0 to 1.0
+        slow_ms: Requests at least this slow are always logged
+    """
+
+    def __init__(
+        self,
+        stream=None,
+        queue_size: int = 10000,
+        sample_rate: float = 1.0,
+        slow_ms: float = 500,
+    ):
+        self.stream = stream if stream is not None else sys.stdout
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+
+    def start(self) -> "AccessLogger":
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._drain, name="access-log", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        """Write the queued records and stop the background thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def should_log(self, status: int, duration_ms: float) -> bool:
+        """Errors and slow requests are always logged, others sampled."""
+        if status >= 500 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def log(self, record: dict) -> bool:
+        """Queue a record without blocking, returns False if dropped."""
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            metrics.inc(
+                "configmap_reader_access_log_dropped_total",
+                help="Access log records dropped because the queue was full",
+            )
+            return False
+
+    def _drain(self) -> None:
+        while True:
+            records = [self._queue.get()]
+            while True:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is _STOP for record in records)
+            lines = [
+                json.dumps(record) + "\n"
+                for record in records
+                if record is not _STOP
+            ]
+            try:
+                self.stream.write("".join(lines))
+                self.stream.flush()
+            except Exception:
+                pass
+            if stop:
+                return
+
+
+class AccessLogMiddleware:
+    """ASGI middleware sending one record per HTTP request to a logger."""
+
+    def __init__(self, app, logger: AccessLogger):
+        self.app = app
+        self.logger = logger
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if self.logger.should_log(status, duration_ms):
+                client = scope.get("client")
+                self.logger.log({
+                    "time": time.time(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "query": scope.get("query_string", b"").decode("latin-1"),
+                    "status": status,
+                    "duration_ms": round(duration_ms, 3),
+                    "client": client[0] if client else None,
+                })
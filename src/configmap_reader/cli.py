@@ -1,6 +1,5 @@
 import argparse
 from importlib.metadata import version
-from . import main
 
 
 def run() -> None:
@@ -14,6 +13,15 @@ def run() -> None:
         "-v", "--version", action="version", version=f"%(prog)s {__version__}"
     )
 
-    parser.parse_args()
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="serve HTTP/2 cleartext (h2c) and HTTP/1.1 with hypercorn",
+    )
+
+    args = parser.parse_args()
+
+    # Imported after parsing so --help and --version don't load the server
+    from . import main
 
-    main.run()
+    main.run(http2=args.http2)
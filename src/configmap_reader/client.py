@@ -0,0 +1,208 @@
+"""Python clients for the configmap-reader ``/config`` endpoint.
+
+Both clients keep one pooled keep-alive connection and cache responses in
+process, revalidating them with ``If-None-Match`` so an unchanged config
+costs a ``304`` without a body. They require ``httpx``.
+
+Example:
+    with Client("http://configmap-reader") as client:
+        config = client.get().json()
+        for config in client.subscribe(interval=5):
+            apply(config.json())
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+DEFAULT_TIMEOUT = 5.0
+
+
+def _httpx():
+    try:
+        import httpx
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "configmap_reader.client requires httpx: "
+            "pip install 'configmap_reader[client]'"
+        ) from e
+    return httpx
+
+
+class ConfigResponse:
+    """A /config response, possibly served from the local cache."""
+
+    __slots__ = ("status_code", "content", "headers", "from_cache")
+
+    def __init__(self, status_code, content, headers, from_cache=False):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+        self.from_cache = from_cache
+
+    @property
+    def version(self):
+        return self.headers.get("x-config-version")
+
+    @property
+    def etag(self):
+        return self.headers.get("etag")
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class _ResponseCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    @staticmethod
+    def key(path: str, params: dict, accept: str) -> tuple:
+        return (path, tuple(sorted(params.items())), accept)
+
+    def request_headers(self, key: tuple, headers: dict) -> dict:
+        headers = dict(headers)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        return headers
+
+    def update(self, key: tuple, response) -> ConfigResponse:
+        with self._lock:
+            if response.status_code == 304 and key in self._entries:
+                cached = self._entries[key]
+                return ConfigResponse(
+                    cached.status_code, cached.content, cached.headers, True
+                )
+            result = ConfigResponse(
+                response.status_code,
+                response.content,
+                dict(response.headers),
+            )
+            if "etag" in result.headers:
+                self._entries[key] = result
+            else:
+                self._entries.pop(key, None)
+            return result
+
+
+class Client:
+    """Synchronous client with a pooled connection and conditional GETs.
+
+    Args:
+        base_url: URL of the configmap-reader service
+        timeout: Request timeout in seconds
+        accept: Accept header sent with every request
+        http_client: Existing ``httpx.Client`` to use instead of a new one
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        timeout: float = DEFAULT_TIMEOUT,
+        accept: str = "application/json",
+        http_client=None,
+    ):
+        if http_client is None:
+            httpx = _httpx()
+            http_client = httpx.Client(base_url=base_url, timeout=timeout)
+        self._http = http_client
+        self._accept = accept
+        self._cache = _ResponseCache()
+
+    def get(self, path: str = "/config", **params) -> ConfigResponse:
+        """Fetch the config, revalidating a cached copy with its ETag."""
+        params = {k: v for k, v in params.items() if v is not None}
+        key = self._cache.key(path, params, self._accept)
+        headers = self._cache.request_headers(key, {"Accept": self._accept})
+        response = self._http.get(path, params=params, headers=headers)
+        return self._cache.update(key, response)
+
+    def subscribe(self, interval: float = 1.0, **params):
+        """Yield the config now and every time it changes.
+
+        The server has no push stream, so this polls with conditional GETs,
+        which cost a 304 without a body while nothing changed.
+        """
+        version = None
+        while True:
+            result = self.get(**params)
+            if result.version != version:
+                version = result.version
+                yield result
+            time.sleep(interval)
+
+    def close(self) -> None:
+        self._http.close()
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class AsyncClient:
+    """Asynchronous client with a pooled connection and conditional GETs.
+
+    Args:
+        base_url: URL of the configmap-reader service
+        timeout: Request timeout in seconds
+        accept: Accept header sent with every request
+        http_client: Existing ``httpx.AsyncClient`` to use instead of a
+            new one
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        timeout: float = DEFAULT_TIMEOUT,
+        accept: str = "application/json",
+        http_client=None,
+    ):
+        if http_client is None:
+            httpx = _httpx()
+            http_client = httpx.AsyncClient(
+                base_url=base_url, timeout=timeout
+            )
+        self._http = http_client
+        self._accept = accept
+        self._cache = _ResponseCache()
+
+    async def get(self, path: str = "/config", **params) -> ConfigResponse:
+        """Fetch the config, revalidating a cached copy with its ETag."""
+        params = {k: v for k, v in params.items() if v is not None}
+        key = self._cache.key(path, params, self._accept)
+        headers = self._cache.request_headers(key, {"Accept": self._accept})
+        response = await self._http.get(path, params=params, headers=headers)
+        return self._cache.update(key, response)
+
+    async def subscribe(self, interval: float = 1.0, **params):
+        """Yield the config now and every time it changes.
+
+        The server has no push stream, so this polls with conditional GETs,
+        which cost a 304 without a body while nothing changed.
+        """
+        version = None
+        while True:
+            result = await self.get(**params)
+            if result.version != version:
+                version = result.version
+                yield result
+            await asyncio.sleep(interval)
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+
+    async def __aenter__(self) -> "AsyncClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
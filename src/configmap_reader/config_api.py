@@ -1,6 +1,49 @@
+import base64
+import collections
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import HTTPException
 
+from . import metrics, ratelimit
+from .snapshot import RawData, SnapshotTooLarge
+
+API_QPS = float(os.getenv("API_QPS", "0"))  # 0: no limit
+API_BURST = int(os.getenv("API_BURST", "5"))
+API_REFRESH_INTERVAL = float(os.getenv("API_REFRESH_INTERVAL", "0"))
+API_REFRESH_JITTER = float(os.getenv("API_REFRESH_JITTER", "0.2"))
+API_BACKOFF_BASE = float(os.getenv("API_BACKOFF_BASE", "0.5"))
+API_BACKOFF_MAX = float(os.getenv("API_BACKOFF_MAX", "30"))
+API_CACHE_SIZE = int(os.getenv("API_CACHE_SIZE", "128"))
+
 _k8s_client = None
+_limiter = ratelimit.TokenBucket(API_QPS, API_BURST)
+_state_lock = threading.Lock()
+# LRUs of at most API_CACHE_SIZE ConfigMaps each, only written after a
+# call to the API so names that are never fetched don't take entries.
+# (namespace, name) -> {"data", "refresh_at"}, of successful reads
+_cache = collections.OrderedDict()
+# (namespace, name) -> {"retry_at", "backoff", "status_code", "detail"},
+# the last error is raised again while backing off, until the next success
+_failures = collections.OrderedDict()
+# (namespace, name) -> (resourceVersion, decoded binaryData)
+_binary_cache = collections.OrderedDict()
+
+metrics.set_gauge(
+    "configmap_reader_api_qps_budget",
+    API_QPS,
+    help="Configured Kubernetes API calls per second, 0 is unlimited",
+)
+
+
+def _remember(cache: collections.OrderedDict, key, value) -> None:
+    # Callers hold _state_lock
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > API_CACHE_SIZE:
+        cache.popitem(last=False)
 
 
 def _get_k8s_client():
@@ -23,16 +66,57 @@ def _get_k8s_client():
         )
 
 
+def preload() -> None:
+    """Create the Kubernetes client ahead of the first read.
+
+    Errors are left for ``read`` to report.
+    """
+    try:
+        _get_k8s_client()
+    except HTTPException:
+        pass
+
+
 def read(configmap_name: str, namespace: str) -> dict:
     """
     Read ConfigMap via Kubernetes API.
 
+    API calls are limited to API_QPS per second. With API_REFRESH_INTERVAL
+    set, the ConfigMap is cached and refreshed after a jittered interval,
+    and the cached data is served while the budget is exhausted or while
+    backing off after an error.
+
     Args:
         configmap_name: Name of the ConfigMap to read
         namespace: Kubernetes namespace
 
     Returns:
-        dict: ConfigMap data as filename -> string content
+        dict: ConfigMap data as filename -> string content, and
+            binaryData as filename -> bytes
+    """
+    raw = read_raw(configmap_name, namespace)
+    return {
+        key: value if key in raw.binary else value.decode("utf-8")
+        for key, value in raw.values.items()
+    }
+
+
+def read_raw(
+    configmap_name: str, namespace: str, max_bytes: int = 0
+) -> RawData:
+    """
+    Read ConfigMap via Kubernetes API as bytes, see ``read``.
+
+    The cache keeps these bytes only, no decoded copy.
+
+    Args:
+        configmap_name: Name of the ConfigMap to read
+        namespace: Kubernetes namespace
+        max_bytes: Refuse ConfigMaps holding more bytes, 0 for no limit
+
+    Raises:
+        SnapshotTooLarge: If the ConfigMap is larger than ``max_bytes``,
+            it is then not cached
     """
     if not configmap_name:
         raise HTTPException(
@@ -43,6 +127,100 @@ def read(configmap_name: str, namespace: str) -> dict:
         raise HTTPException(
             status_code=500, detail="NAMESPACE is not set for API read mode"
         )
+    key = (namespace, configmap_name)
+    now = time.monotonic()
+    with _state_lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+            if now < entry["refresh_at"]:
+                metrics.inc(
+                    "configmap_reader_api_cache_hits_total",
+                    help="Reads answered from cache before the refresh time",
+                )
+                return entry["data"]
+        failure = _failures.get(key)
+        if failure is not None and now < failure["retry_at"]:
+            return _stale_or_raise(
+                entry, failure["detail"], failure["status_code"]
+            )
+        if not _limiter.try_acquire():
+            metrics.inc(
+                "configmap_reader_api_throttled_total",
+                help="Kubernetes API calls skipped by the request budget",
+            )
+            return _stale_or_raise(
+                entry, "Kubernetes API request budget exhausted"
+            )
+
+    metrics.inc(
+        "configmap_reader_api_requests_total",
+        help="Calls made to the Kubernetes API",
+    )
+    try:
+        data = _fetch(configmap_name, namespace)
+    except HTTPException as e:
+        with _state_lock:
+            previous = _failures.get(key)
+            backoff = ratelimit.decorrelated_jitter(
+                previous["backoff"] if previous is not None else 0.0,
+                API_BACKOFF_BASE,
+                API_BACKOFF_MAX,
+            )
+            _remember(_failures, key, {
+                "retry_at": time.monotonic() + backoff,
+                "backoff": backoff,
+                "status_code": e.status_code,
+                "detail": e.detail,
+            })
+            metrics.inc(
+                "configmap_reader_api_errors_total",
+                help="Failed calls to the Kubernetes API",
+            )
+            metrics.set_gauge(
+                "configmap_reader_api_backoff_seconds",
+                backoff,
+                help="Last backoff delay after a Kubernetes API error",
+            )
+            entry = _cache.get(key)
+            if entry is not None:
+                return _stale_or_raise(entry, "")
+        raise
+
+    with _state_lock:
+        _failures.pop(key, None)
+        if max_bytes > 0 and data.size > max_bytes:
+            # The cached data, if any, keeps being served until the refresh
+            entry = _cache.get(key)
+            if entry is not None and API_REFRESH_INTERVAL > 0:
+                entry["refresh_at"] = time.monotonic() + ratelimit.jittered(
+                    API_REFRESH_INTERVAL, API_REFRESH_JITTER
+                )
+            raise SnapshotTooLarge(
+                f"ConfigMap {namespace}/{configmap_name} holds {data.size} "
+                f"bytes, more than the budget of {max_bytes} bytes"
+            )
+        if API_REFRESH_INTERVAL > 0:
+            _remember(_cache, key, {
+                "data": data,
+                "refresh_at": time.monotonic() + ratelimit.jittered(
+                    API_REFRESH_INTERVAL, API_REFRESH_JITTER
+                ),
+            })
+    return data
+
+
+def _stale_or_raise(entry, detail: str, status_code: int = 503) -> RawData:
+    if entry is not None:
+        metrics.inc(
+            "configmap_reader_api_stale_served_total",
+            help="Reads answered from cache because the API was not called",
+        )
+        return entry["data"]
+    raise HTTPException(status_code=status_code, detail=detail)
+
+
+def _fetch(configmap_name: str, namespace: str) -> RawData:
     api = _get_k8s_client()
     try:
         cm = api.read_namespaced_config_map(
@@ -53,5 +231,73 @@ def read(configmap_name: str, namespace: str) -> dict:
             status_code=500,
             detail=f"Failed to read ConfigMap {namespace}/{configmap_name}: {e}",  # noqa: E501
         )
-    data = cm.data or {}
-    return dict(data)
+    values = {
+        key: str(value).encode("utf-8")
+        for key, value in (cm.data or {}).items()
+    }
+    binary = frozenset()
+    binary_data = getattr(cm, "binary_data", None)
+    if isinstance(binary_data, dict) and binary_data:
+        decoded = _decode_binary(
+            (namespace, configmap_name),
+            cm.metadata.resource_version,
+            binary_data,
+        )
+        values.update(decoded)
+        binary = frozenset(decoded)
+    return RawData(values, binary)
+
+
+def _decode_binary(key: tuple, resource_version, binary_data: dict) -> dict:
+    # Decode binaryData once per resourceVersion and share the bytes
+    with _state_lock:
+        cached = _binary_cache.get(key)
+    if cached is not None and resource_version and (
+        cached[0] == resource_version
+    ):
+        return cached[1]
+    try:
+        decoded = {
+            name: base64.b64decode(value)
+            for name, value in binary_data.items()
+        }
+    except (TypeError, ValueError) as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Invalid binaryData in ConfigMap {key[0]}/{key[1]}: {e}",
+        )
+    with _state_lock:
+        _remember(_binary_cache, key, (resource_version, decoded))
+    return decoded
+
+
+def read_many(
+    configmap_names: list, namespace: str, max_workers: int = 8
+) -> dict:
+    """
+    Read several ConfigMaps concurrently via Kubernetes API.
+
+    Args:
+        configmap_names: Names of the ConfigMaps to read
+        namespace: Kubernetes namespace
+        max_workers: Maximum number of concurrent API calls
+
+    Returns:
+        dict: ConfigMap name -> ConfigMap data, or the HTTPException
+            raised while reading that ConfigMap
+    """
+    names = list(dict.fromkeys(configmap_names))
+    if not names:
+        return {}
+    workers = max(1, min(max_workers, len(names)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            name: pool.submit(read, name, namespace) for name in names
+        }
+    results = {}
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except HTTPException as e:
+            results[name] = e
+    return results
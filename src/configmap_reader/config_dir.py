@@ -1,8 +1,201 @@
-import pathlib
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
 
+from .snapshot import RawData, SnapshotTooLarge
 
 CONFIG_DIR = os.getenv("CONFIG_DIR", "/config")
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", "4"))
+# Below this many changed files, reading sequentially is faster
+PARALLEL_MIN_FILES = 16
+
+# kubelet mounts ConfigMaps as <dir>/..data -> <dir>/..<timestamp>/
+KUBELET_DATA_DIR = "..data"
+
+_scan_lock = threading.Lock()
+# config_dir -> {filename: ((inode, mtime_ns, size), content, binary)}
+# content is the only copy of the file kept, as bytes
+_scan_cache = {}
+
+
+class ScanResult(NamedTuple):
+    data: dict
+    added: list
+    modified: list
+    removed: list
+
+
+def _resolve(config_dir: str) -> str:
+    data_dir = os.path.join(config_dir, KUBELET_DATA_DIR)
+    if os.path.isdir(data_dir):
+        return os.path.realpath(data_dir)
+    return config_dir
+
+
+def _read_file(path: str):
+    try:
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        # Left for _scan, the generation being read was removed
+        raise
+    except OSError:
+        return None, False
+    try:
+        raw.decode("utf-8")
+    except UnicodeDecodeError:
+        # binaryData keys and other non UTF-8 files
+        return raw, True
+    return raw, False
+
+
+def _decode(content: bytes, binary: bool):
+    return content if binary else content.decode("utf-8")
+
+
+def _read_chunk(paths: list) -> list:
+    return [_read_file(path) for path in paths]
+
+
+def _read_parallel(paths: list, max_workers: int) -> list:
+    # One chunk per thread keeps the per-file overhead of the pool low
+    workers = min(max_workers, len(paths))
+    size = -(-len(paths) // workers)
+    chunks = [paths[i:i + size] for i in range(0, len(paths), size)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_read_chunk, chunks)
+    return [content for chunk in results for content in chunk]
+
+
+def _list_files(root: str) -> dict:
+    files = {}
+    with os.scandir(root) as it:
+        for entry in it:
+            try:
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+            except OSError:
+                continue
+            files[entry.name] = (
+                entry.path,
+                (st.st_ino, st.st_mtime_ns, st.st_size),
+            )
+    return files
+
+
+def _list_config_files(config_dir: str) -> dict:
+    try:
+        return _list_files(_resolve(config_dir))
+    except FileNotFoundError:
+        # kubelet swapped ..data and removed the directory it pointed to
+        # after it was resolved, the new one is there now
+        return _list_files(_resolve(config_dir))
+
+
+def _list_and_read(
+    config_dir: str, previous: dict, max_workers: int, max_bytes: int
+) -> tuple:
+    files = _list_config_files(config_dir)
+
+    if max_bytes > 0:
+        size = sum(signature[2] for _, signature in files.values())
+        if size > max_bytes:
+            # Refused before reading, the cache keeps the last content
+            raise SnapshotTooLarge(
+                f"Config directory {config_dir} holds {size} bytes, "
+                f"more than the budget of {max_bytes} bytes"
+            )
+
+    current = {}
+    changed = []
+    for name, (path, signature) in files.items():
+        cached = previous.get(name)
+        if cached is not None and cached[0] == signature:
+            current[name] = cached
+        else:
+            changed.append((name, path, signature))
+
+    paths = [path for _, path, _ in changed]
+    if len(paths) >= PARALLEL_MIN_FILES and max_workers > 1:
+        contents = _read_parallel(paths, max_workers)
+    else:
+        contents = [_read_file(path) for path in paths]
+    return files, current, changed, contents
+
+
+def _scan(config_dir: str, max_workers: int, max_bytes: int = 0) -> tuple:
+    if not os.path.isdir(config_dir):
+        raise FileNotFoundError(f"Config directory not found: {config_dir}")
+
+    with _scan_lock:
+        previous = _scan_cache.get(config_dir, {})
+        try:
+            files, current, changed, contents = _list_and_read(
+                config_dir, previous, max_workers, max_bytes
+            )
+        except FileNotFoundError:
+            # kubelet swapped ..data and removed the generation being read,
+            # read the new one whole rather than return a mix or a part
+            files, current, changed, contents = _list_and_read(
+                config_dir, previous, max_workers, max_bytes
+            )
+
+        added = []
+        modified = []
+        removed = [
+            name
+            for name, (_, content, _) in previous.items()
+            if name not in files and content is not None
+        ]
+        for (name, _, signature), (content, binary) in zip(changed, contents):
+            current[name] = (signature, content, binary)
+            old = previous.get(name, (None, None, None))[1]
+            if old == content:
+                continue
+            if old is None:
+                added.append(name)
+            elif content is None:
+                removed.append(name)
+            else:
+                modified.append(name)
+        _scan_cache[config_dir] = current
+    return current, sorted(added), sorted(modified), sorted(removed)
+
+
+def scan(config_dir: str = CONFIG_DIR, max_workers: int = SCAN_WORKERS):
+    """Scan the config directory, only reading files that changed.
+
+    If the directory is a kubelet ConfigMap mount, the ``..data`` link is
+    resolved once so all keys come from the same generation. When that
+    generation is removed while it is read, the directory is listed and
+    read again. Files whose
+    (inode, mtime, size) did not change since the last scan are not read
+    again, changed files are read in parallel.
+
+    Args:
+        config_dir: Path to the configuration directory
+        max_workers: Maximum number of threads reading changed files
+
+    Returns:
+        ScanResult: All filenames mapped to their content, and the
+            filenames added, modified and removed since the last scan
+
+    Raises:
+        FileNotFoundError: If the config directory doesn't exist or
+            isn't a directory, or its files were removed again while
+            they were read a second time
+    """
+    current, added, modified, removed = _scan(config_dir, max_workers)
+    data = {
+        name: _decode(content, binary)
+        for name, (_, content, binary) in current.items()
+        if content is not None
+    }
+    return ScanResult(
+        data=data, added=added, modified=modified, removed=removed
+    )
 
 
 def read(config_dir: str = CONFIG_DIR) -> dict:
@@ -12,21 +205,37 @@ def read(config_dir: str = CONFIG_DIR) -> dict:
         config_dir: Path to the configuration directory
 
     Returns:
-        Dictionary mapping filenames to their content
+        Dictionary mapping filenames to their content, as str for UTF-8
+        files and as bytes otherwise
 
     Raises:
         FileNotFoundError: If the config directory doesn't exist or
             isn't a directory
     """
-    path = pathlib.Path(config_dir)
-    if not path.exists() or not path.is_dir():
-        raise FileNotFoundError(f"Config directory not found: {config_dir}")
-    result = {}
-    for p in path.iterdir():
-        if p.is_file():
-            try:
-                content = p.read_text(encoding="utf-8")
-            except UnicodeDecodeError:
-                continue
-            result[p.name] = content
-    return result
+    return scan(config_dir).data
+
+
+def read_raw(config_dir: str = CONFIG_DIR, max_bytes: int = 0) -> RawData:
+    """Read all files from the config directory as bytes.
+
+    The returned bytes are the ones held by the scan cache, an unchanged
+    file is the same object on every call.
+
+    Args:
+        config_dir: Path to the configuration directory
+        max_bytes: Refuse directories holding more bytes, 0 for no limit
+
+    Raises:
+        FileNotFoundError: If the config directory doesn't exist or
+            isn't a directory
+        SnapshotTooLarge: If the files are larger than ``max_bytes``
+    """
+    current, _, _, _ = _scan(config_dir, SCAN_WORKERS, max_bytes)
+    values = {}
+    binary = set()
+    for name, (_, content, is_binary) in current.items():
+        if content is not None:
+            values[name] = content
+            if is_binary:
+                binary.add(name)
+    return RawData(values, frozenset(binary))
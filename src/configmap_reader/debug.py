@@ -0,0 +1,125 @@
+"""On-demand profiling endpoints.
+
+The router is only mounted when ``DEBUG_ENDPOINTS`` is enabled, so none of
+this code runs (and tracemalloc stays off) in a normal deployment.
+"""
+
+import collections
+import sys
+import threading
+import time
+import tracemalloc
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+router = APIRouter(prefix="/debug")
+
+MAX_PROFILE_SECONDS = 60
+SAMPLE_INTERVAL = 0.005
+
+_profile_lock = threading.Lock()
+_last_snapshot = None
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _collapse(frame) -> str:
+    stack = []
+    while frame is not None:
+        stack.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(stack))
+
+
+def sample_stacks(seconds: float, interval: float = SAMPLE_INTERVAL) -> dict:
+    """Sample the stacks of all other threads for the given duration.
+
+    Args:
+        seconds: How long to sample for
+        interval: Delay between two samples
+
+    Returns:
+        dict: Collapsed stack string -> number of samples
+    """
+    own = threading.get_ident()
+    counts = collections.Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id != own:
+                counts[_collapse(frame)] += 1
+        time.sleep(interval)
+    return dict(counts)
+
+
+@router.get("/profile")
+def profile(seconds: float = Query(5, gt=0, le=MAX_PROFILE_SECONDS)):
+    if not _profile_lock.acquire(blocking=False):
+        raise HTTPException(
+            status_code=409, detail="A profile is already running"
+        )
+    try:
+        counts = sample_stacks(seconds)
+    finally:
+        _profile_lock.release()
+    lines = [
+        f"{stack} {count}"
+        for stack, count in sorted(
+            counts.items(), key=lambda item: item[1], reverse=True
+        )
+    ]
+    return PlainTextResponse(content="\n".join(lines) + "\n")
+
+
+def _stat_to_dict(stat) -> dict:
+    frame = stat.traceback[0]
+    return {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size": stat.size,
+        "count": stat.count,
+    }
+
+
+def _diff_to_dict(stat) -> dict:
+    result = _stat_to_dict(stat)
+    result["size_diff"] = stat.size_diff
+    result["count_diff"] = stat.count_diff
+    return result
+
+
+@router.get("/memory")
+def memory(limit: int = Query(20, gt=0, le=1000)):
+    global _last_snapshot
+    started = False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        started = True
+        _last_snapshot = None
+
+    snapshot = tracemalloc.take_snapshot()
+    top = snapshot.statistics("lineno")[:limit]
+    diff = []
+    if _last_snapshot is not None:
+        diff = snapshot.compare_to(_last_snapshot, "lineno")[:limit]
+    _last_snapshot = snapshot
+
+    current, peak = tracemalloc.get_traced_memory()
+    return {
+        "tracing_started": started,
+        "traced_current": current,
+        "traced_peak": peak,
+        "top": [_stat_to_dict(stat) for stat in top],
+        "diff": [_diff_to_dict(stat) for stat in diff],
+    }
+
+
+@router.delete("/memory")
+def stop_memory():
+    global _last_snapshot
+    tracemalloc.stop()
+    _last_snapshot = None
+    return {"status": "stopped"}
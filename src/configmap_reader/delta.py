@@ -0,0 +1,46 @@
+"""RFC 6902 JSON Patch between two parsed JSON bodies."""
+
+MEDIA_TYPE = "application/json-patch+json"
+
+# Cached in place of a patch when the full body has to be served
+FULL = object()
+
+
+def _escape(key) -> str:
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _diff(old, new, path: str, ops: list) -> None:
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key in old:
+                _diff(old[key], value, child, ops)
+            else:
+                ops.append({"op": "add", "path": child, "value": value})
+    elif isinstance(old, list) and isinstance(new, list):
+        common = min(len(old), len(new))
+        for i in range(common):
+            _diff(old[i], new[i], f"{path}/{i}", ops)
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+    # 1 == True and 1 == 1.0 in Python, but not in JSON
+    elif type(old) is not type(new) or old != new:
+        ops.append({"op": "replace", "path": path, "value": new})
+
+
+def diff(old, new) -> list:
+    """Return the JSON Patch operations turning ``old`` into ``new``.
+
+    Objects are compared key by key and arrays index by index, anything
+    else that changed is replaced.
+    """
+    ops = []
+    _diff(old, new, "", ops)
+    return ops
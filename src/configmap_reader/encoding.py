@@ -0,0 +1,172 @@
+"""Accept-based content negotiation with per-version encoded bodies.
+
+MessagePack, CBOR and YAML are only offered when ``msgpack``, ``cbor2`` or
+``PyYAML`` is installed; JSON is always available.
+"""
+
+import collections
+import importlib.util
+import json
+import threading
+from functools import lru_cache
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+CBOR = "application/cbor"
+YAML = "application/yaml"
+
+ALIASES = {
+    "application/x-msgpack": MSGPACK,
+    "application/x-yaml": YAML,
+    "text/yaml": YAML,
+    "text/x-yaml": YAML,
+}
+WILDCARDS = ("*/*", "application/*")
+
+# Marks a body that is not JSON, so it is served as plain text
+TEXT = object()
+
+
+def _encode_json(value) -> bytes:
+    # Same output as fastapi.responses.JSONResponse
+    return json.dumps(
+        value,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def _encode_msgpack(value) -> bytes:
+    import msgpack
+
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _encode_cbor(value) -> bytes:
+    import cbor2
+
+    return cbor2.dumps(value)
+
+
+def _encode_yaml(value) -> bytes:
+    import yaml
+
+    return yaml.safe_dump(
+        value, sort_keys=False, allow_unicode=True
+    ).encode("utf-8")
+
+
+ENCODERS = {
+    JSON: (None, _encode_json),
+    MSGPACK: ("msgpack", _encode_msgpack),
+    CBOR: ("cbor2", _encode_cbor),
+    YAML: ("yaml", _encode_yaml),
+}
+
+
+@lru_cache(maxsize=None)
+def available(media_type: str) -> bool:
+    """Check whether the module needed for a media type is installed."""
+    module, _ = ENCODERS[media_type]
+    return module is None or importlib.util.find_spec(module) is not None
+
+
+def negotiate(accept: str) -> str:
+    """Pick the response media type from an Accept header.
+
+    Args:
+        accept: Value of the Accept header, may be empty
+
+    Returns:
+        str: The preferred available media type, JSON when nothing matches
+    """
+    if not accept:
+        return JSON
+    candidates = []
+    for index, part in enumerate(accept.split(",")):
+        media, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        candidates.append((quality, -index, media.strip().lower()))
+
+    for quality, _, media in sorted(candidates, reverse=True):
+        if quality <= 0:
+            continue
+        if media in WILDCARDS:
+            return JSON
+        media = ALIASES.get(media, media)
+        if media in ENCODERS and available(media):
+            return media
+    return JSON
+
+
+def parse(body: str):
+    """Parse a JSON body, returns TEXT if the body is not JSON."""
+    try:
+        return json.loads(body)
+    except Exception:
+        return TEXT
+
+
+def encode(value, media_type: str) -> bytes:
+    """Encode a parsed body for a media type."""
+    _, encoder = ENCODERS[media_type]
+    return encoder(value)
+
+
+class EncodedCache:
+    """Bounded LRU of encoded bodies keyed by version and a variant key.
+
+    The variant key is the media type, or the media type and the fields of
+    a projection. Entries are evicted beyond ``max_entries`` or, when
+    ``max_bytes`` is set, beyond that many bytes of content.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+
+    @staticmethod
+    def _size(content) -> int:
+        if isinstance(content, bytes):
+            return len(content)
+        # Compiled templates, markers like TEXT only hold a reference
+        return sum(len(chunk) for chunk in getattr(content, "chunks", ()))
+
+    def get(self, version: str, variant):
+        with self._lock:
+            key = (version, variant)
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, version: str, variant, content) -> None:
+        if self.max_entries <= 0:
+            return
+        size = self._size(content)
+        if 0 < self.max_bytes < size:
+            return
+        with self._lock:
+            key = (version, variant)
+            if key in self._entries:
+                self.nbytes -= self._size(self._entries[key])
+            self._entries[key] = content
+            self._entries.move_to_end(key)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or (
+                0 < self.max_bytes < self.nbytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= self._size(evicted)
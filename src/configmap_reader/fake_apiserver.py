@@ -0,0 +1,366 @@
+"""In-process fake Kubernetes API server for ConfigMaps.
+
+Serves ConfigMap GET, LIST and WATCH with resourceVersions, expires old
+watch positions with 410 Gone, and can add latency, errors and update churn
+so the api read mode can be tested and benchmarked without a cluster.
+
+Usage:
+    configmap-reader-fake-apiserver --port 8001 \\
+        --configmap default/configmap-reader-data \\
+        --data statusCode=200 --data 'body={"key": "value"}'
+"""
+
+import argparse
+import base64
+import collections
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_ITEM = re.compile(r"^/api/v1/namespaces/([^/]+)/configmaps/([^/]+)$")
+_NAMESPACED = re.compile(r"^/api/v1/namespaces/([^/]+)/configmaps$")
+_ALL = "/api/v1/configmaps"
+
+DEFAULT_WATCH_TIMEOUT = 30
+
+
+def _status(code: int, reason: str, message: str) -> dict:
+    return {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "metadata": {},
+        "status": "Failure",
+        "message": message,
+        "reason": reason,
+        "code": code,
+    }
+
+
+class FakeApiServer:
+    """Fake API server holding ConfigMaps in memory.
+
+    Args:
+        host: Address to bind to
+        port: Port to bind to, 0 picks a free port
+        latency: Seconds added before every response
+        error_rate: Share of requests answered with 500, 0.0 to 1.0
+        churn_interval: Seconds between automatic updates of a random
+            ConfigMap, 0 disables churn
+        event_window: Number of events kept for watches, older
+            resourceVersions get 410 Gone
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        churn_interval: float = 0.0,
+        event_window: int = 100,
+    ):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.churn_interval = churn_interval
+        self.request_count = 0
+        self._configmaps = {}
+        self._events = collections.deque(maxlen=event_window)
+        self._resource_version = 0
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._threads = []
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def resource_version(self) -> int:
+        with self._cond:
+            return self._resource_version
+
+    def start(self) -> "FakeApiServer":
+        """Serve requests on background threads."""
+        self._stopped.clear()
+        self._spawn(lambda: self._httpd.serve_forever(poll_interval=0.05))
+        if self.churn_interval > 0:
+            self._spawn(self._churn)
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and end open watches."""
+        self._stopped.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+
+    def __enter__(self) -> "FakeApiServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _spawn(self, target) -> None:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def core_v1_api(self):
+        """Return a kubernetes CoreV1Api client pointed at this server."""
+        from kubernetes import client
+
+        configuration = client.Configuration()
+        configuration.host = self.url
+        return client.CoreV1Api(client.ApiClient(configuration))
+
+    def set_configmap(
+        self,
+        namespace: str,
+        name: str,
+        data: dict,
+        binary_data: dict = None,
+    ) -> str:
+        """Create or update a ConfigMap, returns its new resourceVersion.
+
+        ``binary_data`` maps keys to bytes, stored base64 encoded like the
+        real API server does.
+        """
+        with self._cond:
+            self._resource_version += 1
+            rv = str(self._resource_version)
+            existing = self._configmaps.get((namespace, name))
+            if existing:
+                uid = existing["metadata"]["uid"]
+            else:
+                uid = str(uuid.uuid4())
+            obj = {
+                "kind": "ConfigMap",
+                "apiVersion": "v1",
+                "metadata": {
+                    "name": name,
+                    "namespace": namespace,
+                    "uid": uid,
+                    "resourceVersion": rv,
+                },
+                "data": dict(data),
+            }
+            if binary_data:
+                obj["binaryData"] = {
+                    key: base64.b64encode(value).decode("ascii")
+                    for key, value in binary_data.items()
+                }
+            self._configmaps[(namespace, name)] = obj
+            event = "MODIFIED" if existing else "ADDED"
+            self._events.append((self._resource_version, event, obj))
+            self._cond.notify_all()
+            return rv
+
+    def delete_configmap(self, namespace: str, name: str) -> None:
+        """Delete a ConfigMap, raises KeyError if it doesn't exist."""
+        with self._cond:
+            obj = self._configmaps.pop((namespace, name))
+            self._resource_version += 1
+            obj = dict(obj, metadata=dict(obj["metadata"]))
+            obj["metadata"]["resourceVersion"] = str(self._resource_version)
+            self._events.append((self._resource_version, "DELETED", obj))
+            self._cond.notify_all()
+
+    def _churn(self) -> None:
+        while not self._stopped.wait(self.churn_interval):
+            with self._cond:
+                keys = list(self._configmaps)
+            if not keys:
+                continue
+            namespace, name = random.choice(keys)
+            with self._cond:
+                obj = self._configmaps.get((namespace, name))
+                data = dict(obj["data"]) if obj else {}
+            data["churn"] = str(time.time())
+            self.set_configmap(namespace, name, data)
+
+    def get_configmap(self, namespace: str, name: str):
+        with self._cond:
+            return self._configmaps.get((namespace, name))
+
+    def list_configmaps(self, namespace: str = None) -> dict:
+        with self._cond:
+            items = [
+                obj
+                for (ns, _), obj in sorted(self._configmaps.items())
+                if namespace is None or ns == namespace
+            ]
+            return {
+                "kind": "ConfigMapList",
+                "apiVersion": "v1",
+                "metadata": {"resourceVersion": str(self._resource_version)},
+                "items": items,
+            }
+
+    def watch(self, namespace: str, since: int, timeout: float):
+        """Yield (type, object) events after resourceVersion ``since``.
+
+        Yields a single ERROR event with a 410 Status when ``since`` is older
+        than the kept event window.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if since is None:
+                since = self._resource_version
+            oldest = self._events[0][0] if self._events else None
+        if oldest is not None and since < oldest - 1:
+            yield "ERROR", _status(
+                410, "Expired",
+                f"too old resource version: {since} ({oldest - 1})",
+            )
+            return
+        while not self._stopped.is_set():
+            with self._cond:
+                pending = [
+                    (rv, kind, obj)
+                    for rv, kind, obj in self._events
+                    if rv > since and (
+                        namespace is None
+                        or obj["metadata"]["namespace"] == namespace
+                    )
+                ]
+                if not pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                    continue
+            for rv, kind, obj in pending:
+                since = rv
+                yield kind, obj
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server.fake
+        with fake._cond:
+            fake.request_count += 1
+        if fake.latency > 0:
+            time.sleep(fake.latency)
+        if fake.error_rate > 0 and random.random() < fake.error_rate:
+            self._send_json(
+                500, _status(500, "InternalError", "injected error")
+            )
+            return
+
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        item = _ITEM.match(url.path)
+        if item:
+            obj = fake.get_configmap(item.group(1), item.group(2))
+            if obj is None:
+                self._send_json(404, _status(
+                    404, "NotFound",
+                    f'configmaps "{item.group(2)}" not found',
+                ))
+            else:
+                self._send_json(200, obj)
+            return
+
+        namespaced = _NAMESPACED.match(url.path)
+        if namespaced or url.path == _ALL:
+            namespace = namespaced.group(1) if namespaced else None
+            if query.get("watch", "").lower() in ("true", "1"):
+                self._watch(fake, namespace, query)
+            else:
+                self._send_json(200, fake.list_configmaps(namespace))
+            return
+
+        self._send_json(404, _status(404, "NotFound", "not found"))
+
+    def _watch(self, fake, namespace, query):
+        since = query.get("resourceVersion")
+        since = int(since) if since else None
+        timeout = float(query.get("timeoutSeconds", DEFAULT_WATCH_TIMEOUT))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for kind, obj in fake.watch(namespace, since, timeout):
+                line = json.dumps({"type": kind, "object": obj}) + "\n"
+                self._write_chunk(line.encode("utf-8"))
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii"))
+        self.wfile.write(data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, code: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run() -> None:
+    parser = argparse.ArgumentParser(
+        description="Run a fake Kubernetes API server for ConfigMaps"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument(
+        "--configmap", action="append", default=[],
+        help="NAMESPACE/NAME of a ConfigMap to create, can be repeated",
+    )
+    parser.add_argument(
+        "--data", action="append", default=[],
+        help="KEY=VALUE added to every ConfigMap, can be repeated",
+    )
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--churn-interval", type=float, default=0.0)
+    parser.add_argument("--event-window", type=int, default=100)
+    args = parser.parse_args()
+
+    data = dict(item.split("=", 1) for item in args.data)
+    server = FakeApiServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        error_rate=args.error_rate,
+        churn_interval=args.churn_interval,
+        event_window=args.event_window,
+    )
+    for ref in args.configmap:
+        namespace, _, name = ref.partition("/")
+        server.set_configmap(namespace, name, data)
+
+    server.start()
+    print(f"Fake Kubernetes API server listening on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,106 @@
+"""In-memory ring buffer of recent ConfigMap versions.
+
+Values are stored once per distinct content, as the bytes of the Snapshot
+they came from, so a large key that did not change between two versions is
+only kept in memory once.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from .snapshot import Snapshot
+
+
+class History:
+    """Keep the last versions of a ConfigMap, oldest evicted first.
+
+    Args:
+        size: Maximum number of versions kept, 0 disables the history
+        memory_budget: Maximum bytes held by stored values
+    """
+
+    def __init__(self, size: int, memory_budget: int):
+        self.size = size
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._versions = collections.OrderedDict()
+        self._blobs = {}
+        self._refs = collections.Counter()
+        self._memory = 0
+        self._last_version = None
+
+    def record(self, snapshot) -> str:
+        """Record a Snapshot, or a dict of values, and return its version."""
+        if not isinstance(snapshot, Snapshot):
+            snapshot = Snapshot.from_data(snapshot)
+        version = snapshot.version
+        with self._lock:
+            if version == self._last_version:
+                return version
+            self._last_version = version
+            if self.size <= 0:
+                return version
+
+            if version in self._versions:
+                self._versions.move_to_end(version)
+                self._versions[version]["recorded_at"] = time.time()
+                return version
+
+            digests = {key: snapshot.digest(key) for key in snapshot.keys()}
+            for key, digest in digests.items():
+                if self._refs[digest] == 0:
+                    value = snapshot.raw(key)
+                    self._blobs[digest] = value
+                    self._memory += sys.getsizeof(value)
+                self._refs[digest] += 1
+            self._versions[version] = {
+                "digests": digests,
+                "binary": frozenset(
+                    key for key in digests if snapshot.is_binary(key)
+                ),
+                "recorded_at": time.time(),
+            }
+            self._evict()
+            return version
+
+    def _evict(self) -> None:
+        while len(self._versions) > 1 and (
+            len(self._versions) > self.size
+            or self._memory > self.memory_budget
+        ):
+            _, entry = self._versions.popitem(last=False)
+            for digest in entry["digests"].values():
+                self._refs[digest] -= 1
+                if self._refs[digest] == 0:
+                    del self._refs[digest]
+                    self._memory -= sys.getsizeof(self._blobs.pop(digest))
+
+    def get(self, version: str):
+        """Return the Snapshot of a version, or None if not kept."""
+        with self._lock:
+            entry = self._versions.get(version)
+            if entry is None:
+                return None
+            values = {
+                key: self._blobs[digest]
+                for key, digest in entry["digests"].items()
+            }
+        return Snapshot(values, entry["binary"], entry["digests"])
+
+    def versions(self) -> list:
+        """List kept versions, newest first."""
+        with self._lock:
+            return [
+                {
+                    "version": version,
+                    "recorded_at": entry["recorded_at"],
+                    "keys": sorted(entry["digests"]),
+                }
+                for version, entry in reversed(self._versions.items())
+            ]
+
+    @property
+    def memory(self) -> int:
+        return self._memory
@@ -1,49 +1,569 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse, PlainTextResponse
-import os
-import json
-import uvicorn
-from . import config_dir, config_api
+import base64
+import contextlib
+from typing import Optional
 
-app = FastAPI()
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, Response
+import os
+from . import (
+    delta,
+    encoding,
+    history,
+    metrics,
+    projection,
+    snapshot,
+    templating,
+    timing,
+)
 
 CONFIG_DIR = os.getenv("CONFIG_DIR", "/config")
 READ_MODE = os.getenv("READ_MODE", "volume").lower()  # 'volume' or 'api'
 CONFIGMAP_NAME = os.getenv("CONFIGMAP_NAME")
 K8S_NAMESPACE = os.getenv("NAMESPACE") or os.getenv("K8S_NAMESPACE")
+DEBUG_ENDPOINTS = os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "false").lower() == "true"
+TIMING_LOG_SAMPLE_RATE = float(os.getenv("TIMING_LOG_SAMPLE_RATE", "0"))
+HISTORY_SIZE = int(os.getenv("HISTORY_SIZE", "10"))
+HISTORY_MEMORY_BUDGET = int(
+    os.getenv("HISTORY_MEMORY_BUDGET", str(8 * 1024 * 1024))
+)
+BATCH_MAX_NAMES = int(os.getenv("BATCH_MAX_NAMES", "100"))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", "8"))
+ENCODE_CACHE_SIZE = int(os.getenv("ENCODE_CACHE_SIZE", "32"))
+PROJECTION_CACHE_SIZE = int(os.getenv("PROJECTION_CACHE_SIZE", "128"))
+DELTA_CACHE_SIZE = int(os.getenv("DELTA_CACHE_SIZE", "128"))
+# Per cache, for each of the encoded, projected and delta caches
+ENCODE_CACHE_MAX_BYTES = int(
+    os.getenv("ENCODE_CACHE_MAX_BYTES", str(8 * 1024 * 1024))
+)
+ACCESS_LOG = os.getenv("ACCESS_LOG", "false").lower() == "true"
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "1"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "500"))
+ACCESS_LOG_QUEUE_SIZE = int(os.getenv("ACCESS_LOG_QUEUE_SIZE", "10000"))
+HTTP2_KEEP_ALIVE_TIMEOUT = float(os.getenv("HTTP2_KEEP_ALIVE_TIMEOUT", "75"))
+HTTP2_MAX_CONCURRENT_STREAMS = int(
+    os.getenv("HTTP2_MAX_CONCURRENT_STREAMS", "100")
+)
+HTTP2_MAX_REQUESTS = int(os.getenv("HTTP2_MAX_REQUESTS", "100000"))
+HTTP2_BACKLOG = int(os.getenv("HTTP2_BACKLOG", "2048"))
+BODY_TEMPLATES = os.getenv("BODY_TEMPLATES", "false").lower() == "true"
+RELOAD_DEBOUNCE = float(os.getenv("RELOAD_DEBOUNCE", "0"))  # 0: per request
+RELOAD_MAX_STALENESS = float(os.getenv("RELOAD_MAX_STALENESS", "1"))
+# 0: 0.1 in volume mode, API_REFRESH_INTERVAL in api mode
+RELOAD_POLL_INTERVAL = float(os.getenv("RELOAD_POLL_INTERVAL", "0"))
+SNAPSHOT_MEMORY_BUDGET = int(
+    os.getenv("SNAPSHOT_MEMORY_BUDGET", str(32 * 1024 * 1024))
+)
 
 
-@app.get("/config")
-def get_config():
+def _reload_poll_interval() -> float:
+    if RELOAD_POLL_INTERVAL > 0:
+        return RELOAD_POLL_INTERVAL
+    if READ_MODE != "api":
+        return 0.1
+    from . import config_api
+
+    # Every poll is an API call, so api mode polls at the refresh interval
+    if config_api.API_REFRESH_INTERVAL <= 0:
+        raise RuntimeError(
+            "RELOAD_DEBOUNCE in api mode requires API_REFRESH_INTERVAL "
+            "or RELOAD_POLL_INTERVAL"
+        )
+    return config_api.API_REFRESH_INTERVAL
+
+
+@contextlib.asynccontextmanager
+async def _lifespan(app):
+    # Modules are only imported for the READ_MODE in use, api mode loads
+    # the kubernetes client before serving instead of on the first request
     if READ_MODE == "api":
-        data = config_api.read(CONFIGMAP_NAME, K8S_NAMESPACE)
-    else:
-        try:
-            data = config_dir.read(CONFIG_DIR)
-        except FileNotFoundError as e:
+        from . import config_api
+
+        config_api.preload()
+    global reloader
+    if RELOAD_DEBOUNCE > 0:
+        from .reloader import Reloader
+
+        reloader = Reloader(
+            _read_snapshot,
+            _prepare_snapshot,
+            debounce=RELOAD_DEBOUNCE,
+            max_staleness=RELOAD_MAX_STALENESS,
+            poll_interval=_reload_poll_interval(),
+        ).start()
+    if access_logger is not None:
+        access_logger.start()
+    try:
+        yield
+    finally:
+        if reloader is not None:
+            reloader.stop()
+            reloader = None
+        if access_logger is not None:
+            # Writes the records still queued
+            access_logger.stop()
+
+
+app = FastAPI(lifespan=_lifespan)
+
+config_history = history.History(HISTORY_SIZE, HISTORY_MEMORY_BUDGET)
+encoded_bodies = encoding.EncodedCache(
+    ENCODE_CACHE_SIZE, ENCODE_CACHE_MAX_BYTES
+)
+projected_bodies = encoding.EncodedCache(
+    PROJECTION_CACHE_SIZE, ENCODE_CACHE_MAX_BYTES
+)
+# (version, since) -> encoded JSON Patch or delta.FULL
+delta_patches = encoding.EncodedCache(DELTA_CACHE_SIZE, ENCODE_CACHE_MAX_BYTES)
+# Last snapshot within SNAPSHOT_MEMORY_BUDGET
+_accepted = None
+# Publishes snapshots rebuilt in the background, with RELOAD_DEBOUNCE set
+reloader = None
+
+if DEBUG_ENDPOINTS:
+    from . import debug
+
+    app.include_router(debug.router)
+
+if ACCESS_LOG:
+    from . import access_log
+
+    # Its writer thread runs for the lifespan of the app
+    access_logger = access_log.AccessLogger(
+        queue_size=ACCESS_LOG_QUEUE_SIZE,
+        sample_rate=ACCESS_LOG_SAMPLE_RATE,
+        slow_ms=ACCESS_LOG_SLOW_MS,
+    )
+    app.add_middleware(access_log.AccessLogMiddleware, logger=access_logger)
+else:
+    access_logger = None
+
+
+def _read_data() -> snapshot.RawData:
+    if READ_MODE == "api":
+        from . import config_api
+
+        return config_api.read_raw(
+            CONFIGMAP_NAME, K8S_NAMESPACE, max_bytes=SNAPSHOT_MEMORY_BUDGET
+        )
+    from . import config_dir
+
+    try:
+        return config_dir.read_raw(
+            CONFIG_DIR, max_bytes=SNAPSHOT_MEMORY_BUDGET
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _read_snapshot() -> snapshot.Snapshot:
+    """Read the config and return its snapshot, only rebuilt on change.
+
+    Versions larger than SNAPSHOT_MEMORY_BUDGET are refused, before they
+    are read where the read mode allows, and the last accepted snapshot
+    is served instead.
+    """
+    global _accepted
+    previous = _accepted
+    try:
+        raw = _read_data()
+        if not isinstance(raw, snapshot.RawData):
+            raise HTTPException(
+                status_code=500, detail="Invalid config data"
+            )
+        if 0 < SNAPSHOT_MEMORY_BUDGET < raw.size:
+            raise snapshot.SnapshotTooLarge(
+                f"Config holds {raw.size} bytes, more than the budget of "
+                f"{SNAPSHOT_MEMORY_BUDGET} bytes"
+            )
+        result = snapshot.Snapshot.from_raw(raw, previous)
+        if result is previous:
+            return result
+        result.check_budget(SNAPSHOT_MEMORY_BUDGET)
+    except snapshot.SnapshotTooLarge as e:
+        metrics.inc(
+            "configmap_reader_snapshot_refused_total",
+            help="Config reads refused for exceeding the memory budget",
+        )
+        if previous is None:
             raise HTTPException(status_code=500, detail=str(e))
+        return previous
 
-    if not isinstance(data, dict):
-        raise HTTPException(status_code=500, detail="Invalid config data")
+    _accepted = result
+    metrics.set_gauge(
+        "configmap_reader_snapshot_bytes",
+        result.nbytes,
+        help="Memory held by the current config snapshot",
+    )
+    return result
+
+
+def _prepare_snapshot(result: snapshot.Snapshot) -> snapshot.Snapshot:
+    # Runs on the reloader thread, so the first request for a new version
+    # finds its JSON encoding already cached. Snapshots without a body are
+    # published as well, requests then report them like per-request reads
+    version = config_history.record(result)
+    if "body" in result and not result.is_binary("body"):
+        _encoded_content(
+            result.raw("body"),
+            version,
+            encoding.JSON,
+            None,
+            timing.PhaseTimer(),
+        )
+    return result
 
-    status_code_raw = data.get("statusCode")
-    body = data.get("body")
 
-    if status_code_raw is None or body is None:
+def _live_snapshot(timer=None) -> snapshot.Snapshot:
+    current = reloader.current if reloader is not None else None
+    source = "cache"
+    if current is None:
+        current = _read_snapshot()
+        source = READ_MODE
+    if timer is not None:
+        timer.mark("read", desc=source)
+    return current
+
+
+def _status_code(data) -> int:
+    if "statusCode" not in data or "body" not in data:
         raise HTTPException(
             status_code=500, detail="Missing required keys: statusCode or body"
         )
-
     try:
-        status_code = int(status_code_raw)
+        return int(data.get("statusCode"))
     except Exception:
         raise HTTPException(status_code=500, detail="Invalid statusCode value")
 
-    try:
-        parsed = json.loads(body)
-        return JSONResponse(content=parsed, status_code=status_code)
-    except Exception:
-        return PlainTextResponse(content=body, status_code=status_code)
+
+def _validate(data) -> tuple:
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=500, detail="Invalid config data")
+    if data.get("statusCode") is None or data.get("body") is None:
+        raise HTTPException(
+            status_code=500, detail="Missing required keys: statusCode or body"
+        )
+    return _status_code(data), data["body"]
+
+
+def _parse_body(body):
+    if isinstance(body, bytes):
+        return base64.b64encode(body).decode("ascii")
+    parsed = encoding.parse(body)
+    return body if parsed is encoding.TEXT else parsed
+
+
+@app.get("/configs")
+def get_configs(names: str):
+    if READ_MODE != "api":
+        raise HTTPException(
+            status_code=400, detail="Batch reads require READ_MODE=api"
+        )
+    name_list = [name.strip() for name in names.split(",") if name.strip()]
+    if not name_list:
+        raise HTTPException(status_code=400, detail="No names given")
+    if len(name_list) > BATCH_MAX_NAMES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many names, maximum is {BATCH_MAX_NAMES}",
+        )
+
+    from . import config_api
+
+    results = config_api.read_many(
+        name_list, K8S_NAMESPACE, max_workers=BATCH_MAX_WORKERS
+    )
+    configs = {}
+    for name, data in results.items():
+        try:
+            if isinstance(data, HTTPException):
+                raise data
+            status_code, body = _validate(data)
+        except HTTPException as e:
+            configs[name] = {"status": "error", "error": e.detail}
+            continue
+        configs[name] = {
+            "status": "ok",
+            "statusCode": status_code,
+            "body": _parse_body(body),
+        }
+        if isinstance(body, bytes):
+            configs[name]["bodyEncoding"] = "base64"
+    return {"configs": configs}
+
+
+@app.get("/config/history")
+def get_config_history():
+    return {
+        "versions": config_history.versions(),
+        "memory_bytes": config_history.memory,
+    }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _cache_put(cache, version: str, variant, content) -> None:
+    cache.put(version, variant, content)
+    metrics.set_gauge(
+        "configmap_reader_encoded_cache_bytes",
+        encoded_bodies.nbytes + projected_bodies.nbytes + delta_patches.nbytes,
+        help="Bytes held by the encoded, projected and delta body caches",
+    )
+
+
+def _encoded_content(body: bytes, version: str, media_type: str, paths, timer):
+    if paths is None:
+        cache, variant = encoded_bodies, media_type
+    else:
+        cache, variant = projected_bodies, (media_type, paths)
+    content = cache.get(version, variant)
+    if content is not None:
+        timer.mark("parse", desc="cache")
+        return content
+
+    parsed = encoding.parse(body)
+    timer.mark("parse")
+    if parsed is encoding.TEXT:
+        if paths is not None:
+            raise HTTPException(
+                status_code=400, detail="Field projection requires a JSON body"
+            )
+        content = encoding.TEXT
+        if BODY_TEMPLATES:
+            template = templating.compile(body, json_escape=False)
+            if isinstance(template, templating.Template):
+                content = template
+    else:
+        if paths is not None:
+            parsed = projection.project(parsed, paths)
+        content = encoding.encode(parsed, media_type)
+        if BODY_TEMPLATES:
+            # A body with placeholders is served as JSON whatever the media
+            # type, see get_config
+            if media_type != encoding.JSON:
+                source = encoding.encode(parsed, encoding.JSON)
+            else:
+                source = content
+            template = templating.compile(source, json_escape=True)
+            if isinstance(template, templating.Template):
+                content = template
+    _cache_put(cache, version, variant, content)
+    return content
+
+
+def _etag(version: str, media_type: str, fields: Optional[str]) -> str:
+    """Return the ETag of one representation of a version.
+
+    The JSON body without projection is tagged with the bare version, other
+    media types and field lists add a digest so they never match it.
+    """
+    if media_type == encoding.JSON and fields is None:
+        return f'"{version}"'
+    variant = templating.fingerprint([media_type, fields or ""])
+    return f'"{version}-{variant}"'
+
+
+def _not_modified(request: Request, status_code: int, etag: str, version):
+    if 200 <= status_code < 300 and _etag_matches(
+        request.headers.get("if-none-match"), etag
+    ):
+        return Response(
+            status_code=304,
+            headers={"ETag": etag, "X-Config-Version": version},
+        )
+    return None
+
+
+@app.get("/config")
+def get_config(
+    request: Request,
+    version: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    timer = timing.PhaseTimer()
+    paths = None
+    if fields is not None:
+        try:
+            paths = projection.parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if version is None:
+        data = _live_snapshot(timer)
+    else:
+        data = config_history.get(version)
+        if data is None:
+            raise HTTPException(
+                status_code=404, detail=f"Version not found: {version}"
+            )
+        timer.mark("read", desc="history")
+
+    status_code = _status_code(data)
+    if version is None:
+        version = config_history.record(data)
+    timer.mark("validate")
+    return _config_response(
+        request, data, version, status_code, timer, paths, fields
+    )
+
+
+def _config_response(
+    request: Request,
+    data,
+    version: str,
+    status_code: int,
+    timer,
+    paths=None,
+    fields: Optional[str] = None,
+    path: str = "/config",
+) -> Response:
+    """Serve the body of a snapshot that was already read and validated."""
+    body = data.raw("body")
+    if data.is_binary("body"):
+        if paths is not None:
+            raise HTTPException(
+                status_code=400, detail="Field projection requires a JSON body"
+            )
+        media_type = "application/octet-stream"
+    else:
+        media_type = encoding.negotiate(request.headers.get("accept"))
+    etag = _etag(version, media_type, fields)
+    # A templated body can differ per pod and request, so its ETag is only
+    # known once the template is compiled
+    if not BODY_TEMPLATES:
+        not_modified = _not_modified(request, status_code, etag, version)
+        if not_modified is not None:
+            return not_modified
+
+    vary = False
+    if data.is_binary("body"):
+        timer.mark("parse", desc="binary")
+        content = body
+    else:
+        content = _encoded_content(body, version, media_type, paths, timer)
+        if content is encoding.TEXT:
+            content, media_type = body, "text/plain"
+        elif isinstance(content, templating.Template):
+            # Filled in JSON would have to be parsed and encoded again on
+            # every request for other media types, so templates are JSON
+            media_type = encoding.JSON if content.json_escape else "text/plain"
+            vary = content.json_escape
+        else:
+            vary = True
+
+    template = None
+    if isinstance(content, templating.Template):
+        template = content
+        values = template.resolve(request.query_params)
+        etag = f'{etag[:-1]}-{templating.fingerprint(values)}"'
+    if BODY_TEMPLATES:
+        not_modified = _not_modified(request, status_code, etag, version)
+        if not_modified is not None:
+            return not_modified
+    if template is not None:
+        content = template.render(values)
+
+    response = Response(
+        content=content, status_code=status_code, media_type=media_type
+    )
+    if vary:
+        response.headers["Vary"] = "Accept"
+    response.headers["X-Config-Version"] = version
+    if 200 <= status_code < 300:
+        response.headers["ETag"] = etag
+    timer.mark("encode")
+
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = timer.header()
+    timing.log_sampled(
+        timer,
+        TIMING_LOG_SAMPLE_RATE,
+        path=path,
+        read_mode=READ_MODE,
+        status=status_code,
+    )
+    return response
+
+
+def _patchable(data) -> bool:
+    if data.is_binary("body"):
+        return False
+    # Placeholders are only filled in on the full body
+    return not (
+        BODY_TEMPLATES and templating.PLACEHOLDER.search(data.raw("body"))
+    )
+
+
+def _delta_content(data, version: str, since: str):
+    content = delta_patches.get(version, since)
+    if content is not None:
+        return content
+
+    content = delta.FULL
+    base = config_history.get(since)
+    if base is not None and _patchable(base) and _patchable(data):
+        old = encoding.parse(base.raw("body"))
+        new = encoding.parse(data.raw("body"))
+        if old is not encoding.TEXT and new is not encoding.TEXT:
+            patch = encoding.encode(delta.diff(old, new), encoding.JSON)
+            full = encoding.encode(new, encoding.JSON)
+            if len(patch) < len(full):
+                content = patch
+    _cache_put(delta_patches, version, since, content)
+    return content
+
+
+@app.get("/config/delta")
+def get_config_delta(request: Request, since: str):
+    """JSON Patch from version ``since`` to the current body.
+
+    Falls back to the full /config response when ``since`` is no longer
+    kept, the body isn't JSON or the patch would be larger than the body.
+    """
+    timer = timing.PhaseTimer()
+    data = _live_snapshot(timer)
+    status_code = _status_code(data)
+    version = config_history.record(data)
+    timer.mark("validate")
+
+    content = delta.FULL
+    if 200 <= status_code < 300:
+        content = _delta_content(data, version, since)
+    if content is delta.FULL:
+        # The snapshot the decision was made on, not a second read
+        response = _config_response(
+            request, data, version, status_code, timer,
+            path="/config/delta",
+        )
+        response.headers["X-Config-Delta"] = "full"
+        return response
+
+    metrics.inc(
+        "configmap_reader_delta_patches_total",
+        help="Responses to /config/delta served as a JSON Patch",
+    )
+    return Response(
+        content=content,
+        status_code=status_code,
+        media_type=delta.MEDIA_TYPE,
+        headers={
+            "X-Config-Version": version,
+            "X-Config-Delta": "patch",
+            "X-Config-Delta-Since": since,
+        },
+    )
+
+
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(
+        content=metrics.render(), media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get("/health")
@@ -51,11 +571,45 @@ def health():
     return {"status": "ok"}
 
 
-def run():
+def _run_http2(port: int) -> None:
+    try:
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+    except ImportError as e:
+        raise ImportError(
+            "HTTP/2 serving requires hypercorn: "
+            "pip install 'configmap_reader[http2]'"
+        ) from e
+    import asyncio
+
+    config = Config()
+    config.bind = [f"0.0.0.0:{port}"]
+    # Sidecars poll over one long-lived connection each, keep it open
+    # between polls and don't recycle it after a few requests
+    config.keep_alive_timeout = HTTP2_KEEP_ALIVE_TIMEOUT
+    config.keep_alive_max_requests = HTTP2_MAX_REQUESTS
+    config.h2_max_concurrent_streams = HTTP2_MAX_CONCURRENT_STREAMS
+    config.backlog = HTTP2_BACKLOG
+    asyncio.run(serve(app, config))
+
+
+def run(http2: bool = False):
+    """Serve the app with uvicorn, or with hypercorn for HTTP/2 (h2c)."""
+    if http2:
+        _run_http2(int(os.getenv("PORT", "8000")))
+        return
+
+    import uvicorn
+
+    options = {}
+    if ACCESS_LOG:
+        # Replaced by the non-blocking access log
+        options["access_log"] = False
 
     uvicorn.run(
-        "app.main:app",
+        app,
         host="0.0.0.0",
         port=int(os.getenv("PORT", "8000")),
         reload=False,
+        **options,
     )
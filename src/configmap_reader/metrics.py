@@ -0,0 +1,51 @@
+"""Process-wide counters and gauges, rendered in Prometheus text format."""
+
+import threading
+
+_lock = threading.Lock()
+_counters = {}
+_gauges = {}
+_help = {}
+
+
+def inc(name: str, value: float = 1, help: str = None) -> None:
+    """Increase a counter."""
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+        if help:
+            _help[name] = help
+
+
+def set_gauge(name: str, value: float, help: str = None) -> None:
+    """Set a gauge to a value."""
+    with _lock:
+        _gauges[name] = value
+        if help:
+            _help[name] = help
+
+
+def get(name: str) -> float:
+    """Return the current value of a counter or gauge, 0 if unknown."""
+    with _lock:
+        return _counters.get(name, _gauges.get(name, 0))
+
+
+def render() -> str:
+    """Render all metrics in Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for kind, values in (("counter", _counters), ("gauge", _gauges)):
+            for name in sorted(values):
+                if name in _help:
+                    lines.append(f"# HELP {name} {_help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {values[name]}")
+    return "\n".join(lines) + "\n"
+
+
+def reset() -> None:
+    """Forget all metrics."""
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _help.clear()
@@ -0,0 +1,71 @@
+"""Field projection of JSON bodies for ``/config?fields=``.
+
+Fields are comma separated, each either a JSON Pointer (``/a/b/0``) or a
+dotted path (``a.b.0``). The result keeps the nesting of the selected
+subtrees, list indexes become object keys.
+"""
+
+
+def _pointer_segments(pointer: str) -> tuple:
+    return tuple(
+        segment.replace("~1", "/").replace("~0", "~")
+        for segment in pointer[1:].split("/")
+    )
+
+
+def parse_fields(fields: str) -> tuple:
+    """Parse a ``fields`` query value into a canonical tuple of paths.
+
+    Raises:
+        ValueError: If no usable field is given
+    """
+    paths = set()
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field.startswith("/"):
+            paths.add(_pointer_segments(field))
+        else:
+            paths.add(tuple(field.split(".")))
+    if not paths:
+        raise ValueError("No fields given")
+    return tuple(sorted(paths, key=lambda path: (len(path), path)))
+
+
+def _lookup(value, path: tuple):
+    for segment in path:
+        if isinstance(value, dict) and segment in value:
+            value = value[segment]
+        elif (
+            isinstance(value, list)
+            and segment.isdigit()
+            and int(segment) < len(value)
+        ):
+            value = value[int(segment)]
+        else:
+            raise KeyError(segment)
+    return value
+
+
+def project(value, paths: tuple) -> dict:
+    """Return only the selected subtrees of a parsed JSON value.
+
+    Paths that don't exist are left out. When both a path and one of its
+    children are selected, the whole subtree of the shorter path is kept.
+    """
+    result = {}
+    selected = set()
+    for path in paths:
+        if any(path[:i] in selected for i in range(1, len(path))):
+            continue
+        try:
+            found = _lookup(value, path)
+        except KeyError:
+            continue
+        selected.add(path)
+        node = result
+        for segment in path[:-1]:
+            node = node.setdefault(segment, {})
+        node[path[-1]] = found
+    return result
@@ -0,0 +1,31 @@
+"""pytest fixtures for testing api mode against the fake API server.
+
+Registered as a pytest plugin by the package, so the fixtures are
+available in any test suite where configmap_reader is installed.
+"""
+
+import pytest
+
+from . import config_api
+from .fake_apiserver import FakeApiServer
+
+
+@pytest.fixture
+def fake_apiserver():
+    """Fixture running a fake Kubernetes API server."""
+    with FakeApiServer() as server:
+        yield server
+
+
+@pytest.fixture
+def fake_k8s_client(fake_apiserver):
+    """Fixture pointing config_api at the fake Kubernetes API server."""
+    config_api._k8s_client = fake_apiserver.core_v1_api()
+    config_api._cache.clear()
+    config_api._failures.clear()
+    config_api._binary_cache.clear()
+    yield fake_apiserver
+    config_api._k8s_client = None
+    config_api._cache.clear()
+    config_api._failures.clear()
+    config_api._binary_cache.clear()
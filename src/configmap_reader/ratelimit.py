@@ -0,0 +1,54 @@
+"""Client-side request budget helpers for calls to the Kubernetes API."""
+
+import random
+import threading
+import time
+
+
+class TokenBucket:
+    """Allow ``rate`` calls per second on average, bursts up to ``burst``.
+
+    A rate of 0 or less disables the limit.
+    """
+
+    def __init__(self, rate: float, burst: int, clock=time.monotonic):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._updated = clock()
+
+    def try_acquire(self) -> bool:
+        """Take one token, returns False if the budget is exhausted."""
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def jittered(interval: float, jitter: float) -> float:
+    """Spread an interval by +/- ``jitter`` (a fraction of the interval)."""
+    return interval * (1 + random.uniform(-jitter, jitter))
+
+
+def decorrelated_jitter(previous: float, base: float, cap: float) -> float:
+    """Next backoff delay using decorrelated jitter.
+
+    Args:
+        previous: Previous delay, 0 after a success
+        base: Minimum delay
+        cap: Maximum delay
+
+    Returns:
+        float: Delay before the next attempt
+    """
+    return min(cap, random.uniform(base, max(base, previous) * 3))
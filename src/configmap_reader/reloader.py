@@ -0,0 +1,149 @@
+"""Debounced background rebuilds of the served config.
+
+A background thread polls the source and, once changes stop arriving for
+the debounce window, builds the new value and publishes it by swapping a
+single reference. Requests only read that reference, so a burst of updates
+costs one rebuild and never blocks the event loop.
+"""
+
+import logging
+import threading
+import time
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Reloader:
+    """Rebuild a value on a background thread when its source changes.
+
+    Args:
+        read: Returns the current source data
+        build: Turns source data into the published value
+        debounce: Seconds without further changes before rebuilding
+        max_staleness: Seconds after the first unpublished change when a
+            rebuild happens even if changes keep arriving
+        poll_interval: Seconds between reads of the source
+        clock: Monotonic clock, replaceable in tests
+    """
+
+    def __init__(
+        self,
+        read,
+        build,
+        debounce: float = 0.2,
+        max_staleness: float = 1.0,
+        poll_interval: float = 0.1,
+        clock=time.monotonic,
+    ):
+        self.read = read
+        self.build = build
+        self.debounce = debounce
+        self.max_staleness = max_staleness
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.current = None
+        self._seen = None
+        self._first_change = None
+        self._last_change = None
+        self._failing = False
+        self._build_failing = False
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self) -> "Reloader":
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="config-reloader", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5) -> None:
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        self.poll()
+        while not self._stopped.wait(self.poll_interval):
+            self.poll()
+
+    def poll(self) -> bool:
+        """Read the source once, returns True if a new value was published.
+
+        The first value is built right away, later changes are debounced.
+        """
+        try:
+            data = self.read()
+        except Exception:
+            metrics.inc(
+                "configmap_reader_reload_errors_total",
+                help="Failed reads or builds of the reloaded config",
+            )
+            # Logged once when reads start failing, not on every poll
+            if self._failing:
+                logger.debug("Reading the config failed", exc_info=True)
+            else:
+                self._failing = True
+                logger.exception("Reading the config failed")
+            return False
+        if self._failing:
+            self._failing = False
+            logger.warning("Reading the config succeeded again")
+
+        now = self.clock()
+        if self._first_change is None and data == self._seen:
+            return False
+        if self._first_change is None or data != self._seen:
+            metrics.inc(
+                "configmap_reader_reload_changes_total",
+                help="Config changes seen by the reloader",
+            )
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._seen = data
+
+        if self.current is not None and (
+            now - self._last_change < self.debounce
+            and now - self._first_change < self.max_staleness
+        ):
+            return False
+        return self._publish(data, now)
+
+    def _publish(self, data, now: float) -> bool:
+        staleness = now - self._first_change
+        try:
+            value = self.build(data)
+        except Exception:
+            metrics.inc(
+                "configmap_reader_reload_errors_total",
+                help="Failed reads or builds of the reloaded config",
+            )
+            # The change stays pending, so the build is retried on the
+            # next poll, logged once until it succeeds
+            if self._build_failing:
+                logger.debug("Building the config failed", exc_info=True)
+            else:
+                self._build_failing = True
+                logger.exception("Building the config failed")
+            return False
+        self._first_change = None
+        self._build_failing = False
+        # A single reference assignment, readers see the old or new value
+        self.current = value
+        metrics.inc(
+            "configmap_reader_reload_builds_total",
+            help="Config rebuilds published by the reloader",
+        )
+        metrics.set_gauge(
+            "configmap_reader_reload_staleness_seconds",
+            staleness,
+            help="Seconds from the first change to publishing the rebuild",
+        )
+        return True
@@ -0,0 +1,167 @@
+"""Immutable, bytes-only representation of one ConfigMap version."""
+
+import hashlib
+import sys
+from types import MappingProxyType
+from typing import NamedTuple
+
+
+class SnapshotTooLarge(ValueError):
+    """Raised when a snapshot is larger than the memory budget."""
+
+
+def digest(value: bytes) -> str:
+    return hashlib.sha256(value).hexdigest()
+
+
+def version_of(digests: dict) -> str:
+    """Compute the version id of a ConfigMap from its per-key digests."""
+    h = hashlib.sha256()
+    for key in sorted(digests):
+        h.update(key.encode("utf-8"))
+        h.update(b"\0")
+        h.update(digests[key].encode("ascii"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+class RawData(NamedTuple):
+    """ConfigMap values as bytes, as handed over by a read mode."""
+
+    values: dict
+    binary: frozenset = frozenset()
+
+    @property
+    def size(self) -> int:
+        return sum(len(value) for value in self.values.values())
+
+
+def raw_of(data: dict) -> RawData:
+    """Encode a ``read`` result of str and bytes values."""
+    values = {}
+    binary = set()
+    for key, value in data.items():
+        if isinstance(value, bytes):
+            binary.add(key)
+        else:
+            value = str(value).encode("utf-8")
+        values[key] = value
+    return RawData(values, frozenset(binary))
+
+
+class Snapshot:
+    """One canonical bytes copy of every value of a ConfigMap version.
+
+    Text values are stored UTF-8 encoded and only decoded when asked for
+    with ``get``; values that were bytes to begin with stay binary.
+
+    Args:
+        values: Key -> bytes
+        binary: Keys whose value is binary rather than UTF-8 text
+        digests: Key -> sha256 hex digest, computed when not given
+    """
+
+    __slots__ = ("version", "nbytes", "_values", "_binary", "_digests")
+
+    def __init__(self, values: dict, binary=frozenset(), digests=None):
+        if digests is None:
+            digests = {key: digest(value) for key, value in values.items()}
+        values = dict(values)
+        digests = dict(digests)
+        setattr_ = object.__setattr__
+        setattr_(self, "_values", MappingProxyType(values))
+        setattr_(self, "_binary", frozenset(binary))
+        setattr_(self, "_digests", MappingProxyType(digests))
+        setattr_(self, "version", version_of(digests))
+        setattr_(self, "nbytes", self._footprint(values, digests))
+
+    @classmethod
+    def from_raw(cls, raw: RawData, previous=None) -> "Snapshot":
+        """Build a snapshot from bytes values.
+
+        Values equal to those of ``previous`` share its bytes objects and
+        digests instead of being stored and hashed again, and ``previous``
+        itself is returned when nothing changed.
+        """
+        binary = frozenset(raw.binary)
+        changed = previous is None or (
+            len(raw.values) != len(previous) or binary != previous._binary
+        )
+        values = {}
+        digests = {}
+        for key, value in raw.values.items():
+            if previous is not None and key in previous:
+                old = previous.raw(key)
+                if old is value or old == value:
+                    values[key] = old
+                    digests[key] = previous.digest(key)
+                    continue
+            changed = True
+            values[key] = value
+            digests[key] = digest(value)
+        if not changed:
+            return previous
+        return cls(values, binary, digests)
+
+    @classmethod
+    def from_data(cls, data: dict, previous=None) -> "Snapshot":
+        """Build a snapshot from a ``read`` result of str and bytes values."""
+        return cls.from_raw(raw_of(data), previous)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Snapshot is immutable")
+
+    def _footprint(self, values: dict, digests: dict) -> int:
+        # The dicts behind the read-only proxies, not the proxies themselves
+        size = sys.getsizeof(self) + sys.getsizeof(self.version)
+        size += sys.getsizeof(self._values) + sys.getsizeof(values)
+        size += sys.getsizeof(self._digests) + sys.getsizeof(digests)
+        size += sys.getsizeof(self._binary)
+        for key, value in values.items():
+            size += sys.getsizeof(key) + sys.getsizeof(value)
+            size += sys.getsizeof(digests[key])
+        return size
+
+    def __contains__(self, key) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def keys(self):
+        return self._values.keys()
+
+    def raw(self, key: str) -> bytes:
+        """Return the stored bytes of a key."""
+        return self._values[key]
+
+    def is_binary(self, key: str) -> bool:
+        return key in self._binary
+
+    def digest(self, key: str) -> str:
+        return self._digests[key]
+
+    def get(self, key: str, default=None):
+        """Return a value, decoded to str unless it is binary."""
+        if key not in self._values:
+            return default
+        value = self._values[key]
+        return value if key in self._binary else value.decode("utf-8")
+
+    def to_dict(self) -> dict:
+        """Return all values decoded, like a ``read`` result."""
+        return {key: self.get(key) for key in self._values}
+
+    def check_budget(self, budget: int) -> None:
+        """Raise SnapshotTooLarge if the snapshot exceeds ``budget`` bytes.
+
+        A budget of 0 or less disables the check.
+        """
+        if budget > 0 and self.nbytes > budget:
+            raise SnapshotTooLarge(
+                f"Config version {self.version} needs {self.nbytes} bytes, "
+                f"more than the budget of {budget} bytes"
+            )
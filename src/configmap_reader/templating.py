@@ -0,0 +1,107 @@
+"""Body templates with per-pod, env and request placeholders.
+
+``${pod.name}``, ``${pod.namespace}``, ``${pod.ip}``, ``${env.NAME}`` and
+``${query.NAME}`` in a body are replaced when it is served, ``env`` only
+for the variables listed in BODY_TEMPLATE_ENV. A body is
+compiled once per version into static byte chunks and slots, so serving it
+only resolves the slot values and joins the chunks.
+"""
+
+import hashlib
+import json
+import os
+import re
+import socket
+
+PLACEHOLDER = re.compile(rb"\$\{(pod|env|query)\.([A-Za-z0-9_.-]+)\}")
+# Environment variables ${env.NAME} may expose, all others are empty
+ENV_ALLOWLIST = frozenset(
+    name.strip()
+    for name in os.getenv("BODY_TEMPLATE_ENV", "").split(",")
+    if name.strip()
+)
+
+
+def _pod_field(name: str) -> str:
+    # POD_* are expected from the downward API
+    if name == "name":
+        return os.environ.get("POD_NAME") or socket.gethostname()
+    if name == "namespace":
+        return (
+            os.environ.get("POD_NAMESPACE")
+            or os.environ.get("NAMESPACE")
+            or os.environ.get("K8S_NAMESPACE")
+            or ""
+        )
+    if name == "ip":
+        return os.environ.get("POD_IP", "")
+    return ""
+
+
+class Template:
+    """A body split into static chunks around placeholder slots.
+
+    Args:
+        chunks: Static bytes, one more than there are slots
+        slots: (source, name) of every placeholder, in order
+        json_escape: Escape values for use inside JSON strings
+    """
+
+    __slots__ = ("chunks", "slots", "json_escape")
+
+    def __init__(self, chunks: tuple, slots: tuple, json_escape: bool):
+        self.chunks = chunks
+        self.slots = slots
+        self.json_escape = json_escape
+
+    def resolve(self, query) -> list:
+        """Return the value of every slot, ``query`` maps query params."""
+        values = []
+        for source, name in self.slots:
+            if source == "query":
+                value = query.get(name, "")
+            elif source == "env":
+                value = (
+                    os.environ.get(name, "") if name in ENV_ALLOWLIST else ""
+                )
+            else:
+                value = _pod_field(name)
+            values.append(value)
+        return values
+
+    def render(self, values: list) -> bytes:
+        """Join the chunks with the resolved slot values."""
+        parts = [self.chunks[0]]
+        for value, chunk in zip(values, self.chunks[1:]):
+            if self.json_escape:
+                # Placeholders in JSON can only be inside strings
+                value = json.dumps(value, ensure_ascii=False)[1:-1]
+            parts.append(value.encode("utf-8"))
+            parts.append(chunk)
+        return b"".join(parts)
+
+
+def compile(content: bytes, json_escape: bool):
+    """Compile a body, returns it unchanged if it has no placeholders."""
+    chunks = []
+    slots = []
+    start = 0
+    for match in PLACEHOLDER.finditer(content):
+        chunks.append(content[start:match.start()])
+        slots.append((
+            match.group(1).decode("ascii"), match.group(2).decode("ascii")
+        ))
+        start = match.end()
+    if not slots:
+        return content
+    chunks.append(content[start:])
+    return Template(tuple(chunks), tuple(slots), json_escape)
+
+
+def fingerprint(values: list) -> str:
+    """Short digest of slot values, used to tell rendered bodies apart."""
+    h = hashlib.sha256()
+    for value in values:
+        h.update(value.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:8]
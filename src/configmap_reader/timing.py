@@ -0,0 +1,66 @@
+"""Per-request phase timing for the Server-Timing header and timing logs."""
+
+import json
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+# Timing lines are INFO, which uvicorn's WARNING default would drop, so
+# they get their own handler instead of depending on the root config
+logger.setLevel(logging.INFO)
+logger.propagate = False
+_handler = logging.StreamHandler()
+_handler.setFormatter(logging.Formatter("%(message)s"))
+logger.addHandler(_handler)
+
+
+class PhaseTimer:
+    """Record consecutive request phases in milliseconds."""
+
+    def __init__(self):
+        self.phases = []
+        self.descriptions = {}
+        self._last = time.perf_counter()
+
+    def mark(self, name: str, desc: str = None) -> None:
+        """Close the phase that started at the previous mark."""
+        now = time.perf_counter()
+        self.phases.append((name, (now - self._last) * 1000))
+        if desc:
+            self.descriptions[name] = desc
+        self._last = now
+
+    def header(self) -> str:
+        """Render the phases as a Server-Timing header value."""
+        parts = []
+        for name, duration in self.phases:
+            desc = self.descriptions.get(name)
+            if desc:
+                parts.append(f'{name};desc="{desc}";dur={duration:.3f}')
+            else:
+                parts.append(f"{name};dur={duration:.3f}")
+        return ", ".join(parts)
+
+    def as_dict(self) -> dict:
+        return {name: round(duration, 3) for name, duration in self.phases}
+
+
+def log_sampled(timer: PhaseTimer, sample_rate: float, **fields) -> bool:
+    """Emit one structured timing line for a sampled share of requests.
+
+    Args:
+        timer: Timer holding the request phases
+        sample_rate: Share of calls to log, from 0.0 to 1.0
+        **fields: Extra fields to include in the log line
+
+    Returns:
+        bool: True if a line was logged
+    """
+    if sample_rate <= 0 or random.random() >= sample_rate:
+        return False
+    record = dict(fields)
+    record["phases_ms"] = timer.as_dict()
+    record["total_ms"] = round(sum(d for _, d in timer.phases), 3)
+    logger.info(json.dumps(record))
+    return True
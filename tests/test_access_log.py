@@ -0,0 +1,154 @@
+import importlib
+import io
+import json
+import os
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from configmap_reader import metrics
+from configmap_reader.access_log import AccessLogger, AccessLogMiddleware
+
+
+def _lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+@pytest.fixture
+def app_with_log():
+    """Fixture for an app logging every request to a buffer."""
+    stream = io.StringIO()
+    logger = AccessLogger(stream=stream, sample_rate=1.0)
+
+    app = FastAPI()
+
+    @app.get("/ok")
+    def ok():
+        return {"ok": True}
+
+    @app.get("/fail")
+    def fail():
+        raise HTTPException(status_code=503, detail="down")
+
+    app.add_middleware(AccessLogMiddleware, logger=logger)
+    yield TestClient(app), logger, stream
+    logger.stop()
+
+
+class TestAccessLogger:
+    """Test cases for the AccessLogger class."""
+
+    def test_writes_json_lines(self):
+        """Test that queued records are written by the thread."""
+        stream = io.StringIO()
+        logger = AccessLogger(stream=stream).start()
+
+        logger.log({"path": "/a"})
+        logger.log({"path": "/b"})
+        logger.stop()
+
+        assert _lines(stream) == [{"path": "/a"}, {"path": "/b"}]
+
+    def test_drops_when_queue_full(self):
+        """Test that a full queue drops records instead of blocking."""
+        logger = AccessLogger(stream=io.StringIO(), queue_size=2)
+        before = metrics.get("configmap_reader_access_log_dropped_total")
+
+        results = [logger.log({"n": i}) for i in range(5)]
+
+        assert results == [True, True, False, False, False]
+        assert logger.dropped == 3
+        after = metrics.get("configmap_reader_access_log_dropped_total")
+        assert after == before + 3
+
+    def test_should_log_errors_and_slow_requests(self):
+        """Test that errors and slow requests bypass sampling."""
+        logger = AccessLogger(sample_rate=0.0, slow_ms=100)
+
+        assert logger.should_log(500, 1) is True
+        assert logger.should_log(200, 150) is True
+        assert logger.should_log(200, 1) is False
+
+    @patch("configmap_reader.access_log.random.random")
+    def test_should_log_samples(self, mock_random):
+        """Test that normal requests are sampled."""
+        logger = AccessLogger(sample_rate=0.1)
+
+        mock_random.return_value = 0.05
+        assert logger.should_log(200, 1) is True
+        mock_random.return_value = 0.5
+        assert logger.should_log(200, 1) is False
+
+    def test_stop_without_start(self):
+        """Test that stop is safe on a logger that never started."""
+        AccessLogger(stream=io.StringIO()).stop()
+
+
+class TestAccessLogMiddleware:
+    """Test cases for the AccessLogMiddleware class."""
+
+    def test_logs_request(self, app_with_log):
+        """Test that a request produces one record."""
+        client, logger, stream = app_with_log
+        logger.start()
+
+        client.get("/ok?x=1")
+        logger.stop()
+
+        (record,) = _lines(stream)
+        assert record["method"] == "GET"
+        assert record["path"] == "/ok"
+        assert record["query"] == "x=1"
+        assert record["status"] == 200
+        assert record["duration_ms"] >= 0
+
+    def test_logs_error_status(self, app_with_log):
+        """Test that the response status is captured."""
+        client, logger, stream = app_with_log
+        logger.sample_rate = 0.0
+        logger.start()
+
+        client.get("/ok")
+        client.get("/fail")
+        logger.stop()
+
+        assert [r["status"] for r in _lines(stream)] == [503]
+
+
+class TestAccessLogSettings:
+    """Test cases for enabling the access log in main."""
+
+    @patch.dict(os.environ, {"ACCESS_LOG": "true"})
+    def test_access_log_replaces_uvicorn_log(self):
+        """Test that uvicorn's access log is turned off when enabled."""
+        from configmap_reader import main
+        importlib.reload(main)
+        with patch("uvicorn.run") as mock_run:
+            main.run()
+
+        assert mock_run.call_args[1]["access_log"] is False
+        assert any(
+            m.cls is AccessLogMiddleware for m in main.app.user_middleware
+        )
+
+    @patch.dict(os.environ, {"ACCESS_LOG": "true"})
+    def test_access_log_runs_for_lifespan(self):
+        """Test that the writer thread is stopped with the app."""
+        from configmap_reader import main
+        importlib.reload(main)
+
+        with TestClient(main.app):
+            assert main.access_logger._thread is not None
+
+        assert main.access_logger._thread is None
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_access_log_disabled_by_default(self):
+        """Test that no middleware is added by default."""
+        from configmap_reader import main
+        importlib.reload(main)
+
+        assert main.ACCESS_LOG is False
+        assert main.app.user_middleware == []
@@ -1,5 +1,9 @@
 from configmap_reader.cli import run
 
+import subprocess
+import sys
+from unittest.mock import patch
+
 import pytest
 
 
@@ -56,3 +60,33 @@ def test_run_wrong_options(monkeypatch, capsys, options):
     captured = capsys.readouterr()
     assert "usage: configmap-reader [-h] [-v]" in captured.err
     assert "configmap-reader: error: unrecognized arguments:" in captured.err
+
+
+@pytest.mark.parametrize("options, http2", [([], False), (["--http2"], True)])
+def test_run_starts_server(monkeypatch, options, http2):
+    monkeypatch.setattr(
+        "sys.argv",
+        ["configmap-reader"] + options,
+    )
+
+    with patch("configmap_reader.main.run") as mock_run:
+        run()
+
+    mock_run.assert_called_once_with(http2=http2)
+
+
+def test_run_version_does_not_import_server():
+    code = (
+        "import sys\n"
+        "sys.argv = ['configmap-reader', '--version']\n"
+        "from configmap_reader import cli\n"
+        "try:\n"
+        "    cli.run()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('fastapi' in sys.modules, 'uvicorn' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True
+    )
+    assert result.stdout.splitlines()[-1] == "False False"
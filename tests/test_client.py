@@ -0,0 +1,215 @@
+import asyncio
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from configmap_reader.client import AsyncClient, Client
+from configmap_reader.encoding import EncodedCache
+from configmap_reader.history import History
+from configmap_reader.snapshot import raw_of
+
+CONFIG = {"statusCode": "200", "body": '{"key": "value"}'}
+
+
+@pytest.fixture
+def server():
+    """Fixture serving the app in volume mode with a mocked directory."""
+    from configmap_reader import main
+    history = History(5, 1024 * 1024)
+    with patch("configmap_reader.main.READ_MODE", "volume"), \
+            patch("configmap_reader.main.config_history", history), \
+            patch("configmap_reader.main.encoded_bodies", EncodedCache(8)), \
+            patch("configmap_reader.config_dir.read_raw") as mock_read:
+        mock_read.return_value = raw_of(CONFIG)
+        yield main.app, mock_read
+
+
+@pytest.fixture
+def sync_client(server):
+    """Fixture for a sync client talking to the app in process."""
+    app, _ = server
+    return Client(http_client=TestClient(app))
+
+
+class TestServerConditionalGet:
+    """Test cases for ETag support of /config."""
+
+    def test_config_has_etag(self, server):
+        """Test that 2xx responses carry the version as ETag."""
+        app, _ = server
+        response = TestClient(app).get("/config")
+
+        version = response.headers["x-config-version"]
+        assert response.headers["etag"] == f'"{version}"'
+
+    def test_config_not_modified(self, server):
+        """Test that a matching If-None-Match returns 304."""
+        app, _ = server
+        http = TestClient(app)
+        etag = http.get("/config").headers["etag"]
+
+        response = http.get("/config", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_config_modified(self, server):
+        """Test that a stale ETag gets the full body."""
+        app, _ = server
+        http = TestClient(app)
+
+        response = http.get("/config", headers={"If-None-Match": '"old"'})
+
+        assert response.status_code == 200
+        assert response.json() == {"key": "value"}
+
+    def test_etag_differs_per_media_type(self, server):
+        """Test that a JSON ETag does not validate a YAML response."""
+        app, _ = server
+        http = TestClient(app)
+        etag = http.get("/config").headers["etag"]
+
+        response = http.get(
+            "/config",
+            headers={"If-None-Match": etag, "Accept": "application/yaml"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.headers["content-type"].startswith("application/yaml")
+        yaml_etag = response.headers["etag"]
+        assert http.get(
+            "/config",
+            headers={"If-None-Match": yaml_etag, "Accept": "application/yaml"},
+        ).status_code == 304
+
+    def test_etag_differs_per_fields(self, server):
+        """Test that a full body ETag does not validate a projection."""
+        app, _ = server
+        http = TestClient(app)
+        etag = http.get("/config").headers["etag"]
+
+        response = http.get(
+            "/config?fields=key", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["etag"] != etag
+        assert response.json() == {"key": "value"}
+
+    def test_no_etag_for_error_status(self, server):
+        """Test that non-2xx configured responses are not cached."""
+        app, mock_read = server
+        mock_read.return_value = raw_of({"statusCode": "404", "body": "{}"})
+
+        response = TestClient(app).get("/config")
+
+        assert "etag" not in response.headers
+
+
+class TestSyncClient:
+    """Test cases for the sync Client class."""
+
+    def test_get_returns_config(self, sync_client):
+        """Test a plain fetch."""
+        result = sync_client.get()
+
+        assert result.status_code == 200
+        assert result.json() == {"key": "value"}
+        assert result.from_cache is False
+        assert result.version
+
+    def test_get_revalidates_with_etag(self, sync_client):
+        """Test that a second fetch is answered from the local cache."""
+        first = sync_client.get()
+        second = sync_client.get()
+
+        assert second.from_cache is True
+        assert second.content == first.content
+        assert second.version == first.version
+
+    def test_get_picks_up_changes(self, server, sync_client):
+        """Test that a changed config replaces the cached copy."""
+        _, mock_read = server
+        sync_client.get()
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 2}'}
+        )
+
+        result = sync_client.get()
+
+        assert result.from_cache is False
+        assert result.json() == {"v": 2}
+
+    def test_get_with_params(self, sync_client):
+        """Test that query parameters are passed and cached separately."""
+        with patch(
+            "configmap_reader.main.projected_bodies", EncodedCache(8)
+        ):
+            result = sync_client.get(fields="key")
+
+        assert result.json() == {"key": "value"}
+
+    @patch("configmap_reader.client.time.sleep")
+    def test_subscribe_yields_on_change(self, mock_sleep, server, sync_client):
+        """Test that subscribe only yields new versions."""
+        _, mock_read = server
+        bodies = iter(['{"v": 1}', '{"v": 1}', '{"v": 2}'])
+
+        def next_config(*args, **kwargs):
+            return raw_of({"statusCode": "200", "body": next(bodies)})
+
+        mock_read.side_effect = next_config
+        updates = sync_client.subscribe(interval=0)
+
+        assert next(updates).json() == {"v": 1}
+        assert next(updates).json() == {"v": 2}
+        assert mock_read.call_count == 3
+
+    def test_client_creates_pooled_http_client(self):
+        """Test that a base URL creates an httpx client."""
+        with Client("http://example.invalid") as client:
+            assert isinstance(client._http, httpx.Client)
+            assert str(client._http.base_url) == "http://example.invalid"
+
+
+class TestAsyncClient:
+    """Test cases for the AsyncClient class."""
+
+    def _client(self, app):
+        transport = httpx.ASGITransport(app=app)
+        return AsyncClient(
+            http_client=httpx.AsyncClient(
+                transport=transport, base_url="http://test"
+            )
+        )
+
+    def test_get_revalidates_with_etag(self, server):
+        """Test conditional GETs with the async client."""
+        app, _ = server
+
+        async def scenario():
+            async with self._client(app) as client:
+                first = await client.get()
+                second = await client.get()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+
+        assert first.json() == {"key": "value"}
+        assert first.from_cache is False
+        assert second.from_cache is True
+
+    def test_subscribe(self, server):
+        """Test that the async subscription yields the current config."""
+        app, _ = server
+
+        async def scenario():
+            async with self._client(app) as client:
+                async for result in client.subscribe(interval=0):
+                    return result
+
+        assert asyncio.run(scenario()).json() == {"key": "value"}
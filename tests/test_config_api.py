@@ -1,19 +1,28 @@
 """Unit tests for config_api module."""
 
+import base64
 from unittest.mock import MagicMock, patch
 
 import pytest
 from fastapi import HTTPException
 
-from configmap_reader import config_api
+from configmap_reader import config_api, metrics
+from configmap_reader.ratelimit import TokenBucket
+from configmap_reader.snapshot import SnapshotTooLarge
 
 
 @pytest.fixture(autouse=True)
 def reset_k8s_client():
-    """Reset the global k8s client before each test."""
+    """Reset the global k8s client and read state before each test."""
     config_api._k8s_client = None
+    config_api._cache.clear()
+    config_api._failures.clear()
+    config_api._binary_cache.clear()
     yield
     config_api._k8s_client = None
+    config_api._cache.clear()
+    config_api._failures.clear()
+    config_api._binary_cache.clear()
 
 
 class TestGetK8sClient:
@@ -108,6 +117,24 @@ class TestGetK8sClient:
         assert exc_info.value.status_code == 500
 
 
+class TestPreload:
+    """Tests for preload function."""
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_preload_creates_client(self, mock_get_client):
+        """Test that preload creates the client ahead of reads."""
+        config_api.preload()
+
+        mock_get_client.assert_called_once()
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_preload_ignores_errors(self, mock_get_client):
+        """Test that a failing client is left for read to report."""
+        mock_get_client.side_effect = HTTPException(status_code=500)
+
+        config_api.preload()
+
+
 class TestRead:
     """Tests for read function."""
 
@@ -237,3 +264,360 @@ class TestRead:
 
         assert exc_info.value.status_code == 500
         assert "Failed to init Kubernetes client" in exc_info.value.detail
+
+
+class TestReadMany:
+    """Tests for read_many function."""
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_many_success(self, mock_get_client):
+        """Test reading several ConfigMaps in one call."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+
+        def fake_read(name, namespace):
+            cm = MagicMock()
+            cm.data = {"name": name}
+            return cm
+
+        mock_api.read_namespaced_config_map.side_effect = fake_read
+
+        result = config_api.read_many(["a", "b", "c"], "default")
+
+        assert result == {
+            "a": {"name": "a"},
+            "b": {"name": "b"},
+            "c": {"name": "c"},
+        }
+        assert mock_api.read_namespaced_config_map.call_count == 3
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_many_reports_errors_per_name(self, mock_get_client):
+        """Test that one failure does not fail the whole batch."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+
+        def fake_read(name, namespace):
+            if name == "missing":
+                raise Exception("not found")
+            cm = MagicMock()
+            cm.data = {"ok": "yes"}
+            return cm
+
+        mock_api.read_namespaced_config_map.side_effect = fake_read
+
+        result = config_api.read_many(["good", "missing"], "default")
+
+        assert result["good"] == {"ok": "yes"}
+        assert isinstance(result["missing"], HTTPException)
+        assert "not found" in result["missing"].detail
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_many_deduplicates_names(self, mock_get_client):
+        """Test that duplicate names are only read once."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+        mock_api.read_namespaced_config_map.return_value.data = {}
+
+        result = config_api.read_many(["a", "a"], "default")
+
+        assert list(result) == ["a"]
+        mock_api.read_namespaced_config_map.assert_called_once()
+
+    @patch("configmap_reader.config_api.ThreadPoolExecutor")
+    @patch("configmap_reader.config_api.read")
+    def test_read_many_bounds_fan_out(self, mock_read, mock_pool):
+        """Test that the worker count is capped by max_workers."""
+        mock_read.return_value = {}
+        names = [f"cm-{i}" for i in range(20)]
+
+        config_api.read_many(names, "default", max_workers=4)
+
+        mock_pool.assert_called_once_with(max_workers=4)
+
+    def test_read_many_empty(self):
+        """Test that no names gives an empty result."""
+        assert config_api.read_many([], "default") == {}
+
+
+def _api_with_data(mock_get_client, data):
+    mock_api = MagicMock()
+    mock_get_client.return_value = mock_api
+    mock_api.read_namespaced_config_map.return_value.data = data
+    return mock_api
+
+
+class TestReadBudget:
+    """Tests for caching, rate limiting and backoff of read."""
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_cached_until_refresh(self, mock_get_client):
+        """Test that reads are served from cache within the interval."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+
+        first = config_api.read("my-config", "default")
+        second = config_api.read("my-config", "default")
+
+        assert first == second == {"k": "v"}
+        mock_api.read_namespaced_config_map.assert_called_once()
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api.time.monotonic")
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_refreshes_after_jittered_interval(
+        self, mock_get_client, mock_clock
+    ):
+        """Test that the cache is refreshed once the interval passed."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+        mock_clock.return_value = 1000.0
+        config_api.read("my-config", "default")
+        refresh_at = config_api._cache[("default", "my-config")]["refresh_at"]
+
+        assert 1000 + 48 <= refresh_at <= 1000 + 72
+
+        mock_clock.return_value = refresh_at + 0.1
+        config_api.read("my-config", "default")
+
+        assert mock_api.read_namespaced_config_map.call_count == 2
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_not_cached_by_default(self, mock_get_client):
+        """Test that every read calls the API without a refresh interval."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+
+        config_api.read("my-config", "default")
+        config_api.read("my-config", "default")
+
+        assert mock_api.read_namespaced_config_map.call_count == 2
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_raw_returns_bytes(self, mock_get_client):
+        """Test that raw reads hand over the cached bytes."""
+        _api_with_data(mock_get_client, {"k": "v"})
+
+        first = config_api.read_raw("my-config", "default")
+        second = config_api.read_raw("my-config", "default")
+
+        assert first.values == {"k": b"v"}
+        assert second is first
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_raw_refuses_without_caching(self, mock_get_client):
+        """Test that a version over max_bytes is not kept in the cache."""
+        mock_api = _api_with_data(mock_get_client, {"k": "x" * 100})
+
+        with pytest.raises(SnapshotTooLarge):
+            config_api.read_raw("my-config", "default", max_bytes=10)
+        config_api.read_raw("my-config", "default")
+
+        assert mock_api.read_namespaced_config_map.call_count == 2
+
+    @patch("configmap_reader.config_api._limiter", TokenBucket(1, 1))
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_budget_exhausted_without_cache(self, mock_get_client):
+        """Test that calls over the budget fail with 503."""
+        _api_with_data(mock_get_client, {"k": "v"})
+        config_api.read("my-config", "default")
+
+        with pytest.raises(HTTPException) as exc_info:
+            config_api.read("my-config", "default")
+
+        assert exc_info.value.status_code == 503
+        assert "budget exhausted" in exc_info.value.detail
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 0.000001)
+    @patch("configmap_reader.config_api._limiter", TokenBucket(1, 1))
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_budget_exhausted_serves_cache(self, mock_get_client):
+        """Test that cached data is served when over the budget."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+        config_api.read("my-config", "default")
+        before = metrics.get("configmap_reader_api_throttled_total")
+
+        result = config_api.read("my-config", "default")
+
+        assert result == {"k": "v"}
+        mock_api.read_namespaced_config_map.assert_called_once()
+        after = metrics.get("configmap_reader_api_throttled_total")
+        assert after == before + 1
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_backs_off_after_error(self, mock_get_client):
+        """Test that the last error is raised again during the backoff."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+        mock_api.read_namespaced_config_map.side_effect = Exception("down")
+
+        with pytest.raises(HTTPException) as first:
+            config_api.read("my-config", "default")
+        with pytest.raises(HTTPException) as second:
+            config_api.read("my-config", "default")
+
+        assert first.value.status_code == second.value.status_code == 500
+        assert "down" in second.value.detail
+        assert second.value.detail == first.value.detail
+        mock_api.read_namespaced_config_map.assert_called_once()
+
+    @patch("configmap_reader.config_api.API_BACKOFF_BASE", 0)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_without_backoff(self, mock_get_client):
+        """Test that a zero API_BACKOFF_BASE retries the API right away."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+        mock_api.read_namespaced_config_map.side_effect = Exception("down")
+
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                config_api.read("my-config", "default")
+
+        assert mock_api.read_namespaced_config_map.call_count == 2
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api.time.monotonic")
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_serves_stale_on_error(self, mock_get_client, mock_clock):
+        """Test that the last good data is served when the API fails."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+        mock_clock.return_value = 0.0
+        config_api.read("my-config", "default")
+        mock_api.read_namespaced_config_map.side_effect = Exception("down")
+        mock_clock.return_value = 1000.0
+
+        result = config_api.read("my-config", "default")
+
+        assert result == {"k": "v"}
+        assert config_api._failures[("default", "my-config")]["backoff"] > 0
+
+    @patch("configmap_reader.config_api.time.monotonic")
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_backoff_resets_after_success(
+        self, mock_get_client, mock_clock
+    ):
+        """Test that a successful call clears the backoff."""
+        mock_api = _api_with_data(mock_get_client, {"k": "v"})
+        mock_api.read_namespaced_config_map.side_effect = [
+            Exception("down"), mock_api.read_namespaced_config_map.return_value
+        ]
+        mock_clock.return_value = 0.0
+        with pytest.raises(HTTPException):
+            config_api.read("my-config", "default")
+
+        mock_clock.return_value = 1000.0
+        result = config_api.read("my-config", "default")
+
+        assert result == {"k": "v"}
+        assert ("default", "my-config") not in config_api._failures
+
+
+class TestReadCacheBounds:
+    """Tests for the size of the read caches."""
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api._limiter", TokenBucket(1, 1))
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_caches_only_fetched_configmaps(self, mock_get_client):
+        """Test that reads without an API call don't add entries."""
+        _api_with_data(mock_get_client, {"k": "v"})
+        config_api.read("my-config", "default")
+
+        for i in range(10):
+            with pytest.raises(HTTPException):
+                config_api.read(f"other-{i}", "default")
+
+        assert list(config_api._cache) == [("default", "my-config")]
+        assert not config_api._failures
+
+    @patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 60)
+    @patch("configmap_reader.config_api.API_CACHE_SIZE", 2)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_cache_evicts_least_recently_used(self, mock_get_client):
+        """Test that the cache keeps at most API_CACHE_SIZE entries."""
+        _api_with_data(mock_get_client, {"k": "v"})
+        config_api.read("a", "default")
+        config_api.read("b", "default")
+        config_api.read("a", "default")
+
+        config_api.read("c", "default")
+
+        assert list(config_api._cache) == [
+            ("default", "a"), ("default", "c")
+        ]
+
+    @patch("configmap_reader.config_api.API_CACHE_SIZE", 2)
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_failures_bounded(self, mock_get_client):
+        """Test that backoff state is kept for a bounded set of names."""
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+        mock_api.read_namespaced_config_map.side_effect = Exception("down")
+
+        for name in ("a", "b", "c"):
+            with pytest.raises(HTTPException):
+                config_api.read(name, "default")
+
+        assert list(config_api._failures) == [
+            ("default", "b"), ("default", "c")
+        ]
+
+
+class TestReadBinaryData:
+    """Tests for binaryData support of read."""
+
+    def _api(self, mock_get_client, resource_version="1"):
+        mock_api = MagicMock()
+        mock_get_client.return_value = mock_api
+        cm = mock_api.read_namespaced_config_map.return_value
+        cm.data = {"statusCode": "200"}
+        cm.binary_data = {"body": base64.b64encode(b"\x00\xff").decode()}
+        cm.metadata.resource_version = resource_version
+        return mock_api
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_decodes_binary_data(self, mock_get_client):
+        """Test that binaryData is returned as bytes next to data."""
+        self._api(mock_get_client)
+
+        result = config_api.read("my-config", "default")
+
+        assert result == {"statusCode": "200", "body": b"\x00\xff"}
+
+    @patch("configmap_reader.config_api.base64.b64decode")
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_decodes_once_per_version(self, mock_get_client, mock_b64):
+        """Test that the same resourceVersion is not decoded again."""
+        self._api(mock_get_client)
+        mock_b64.return_value = b"\x00\xff"
+
+        first = config_api.read("my-config", "default")
+        second = config_api.read("my-config", "default")
+
+        assert second["body"] is first["body"]
+        mock_b64.assert_called_once()
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_decodes_new_version(self, mock_get_client):
+        """Test that a new resourceVersion is decoded again."""
+        mock_api = self._api(mock_get_client, "1")
+        config_api.read("my-config", "default")
+        cm = mock_api.read_namespaced_config_map.return_value
+        cm.binary_data = {"body": base64.b64encode(b"new").decode()}
+        cm.metadata.resource_version = "2"
+
+        result = config_api.read("my-config", "default")
+
+        assert result["body"] == b"new"
+
+    @patch("configmap_reader.config_api._get_k8s_client")
+    def test_read_invalid_binary_data(self, mock_get_client):
+        """Test that undecodable binaryData fails the read."""
+        mock_api = self._api(mock_get_client)
+        cm = mock_api.read_namespaced_config_map.return_value
+        cm.binary_data = {"body": "a"}
+
+        with pytest.raises(HTTPException) as exc_info:
+            config_api.read("my-config", "default")
+
+        assert "Invalid binaryData" in exc_info.value.detail
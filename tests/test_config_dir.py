@@ -1,5 +1,10 @@
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
 import pytest
-from configmap_reader.config_dir import read
+from configmap_reader.config_dir import read, read_raw, scan
+from configmap_reader.snapshot import SnapshotTooLarge
 
 
 class TestReadConfigDir:
@@ -86,8 +91,8 @@ class TestReadConfigDir:
 
         assert result["special.txt"] == content
 
-    def test_read_skips_binary_files(self, tmp_path):
-        """Test that binary files that can't be decoded are skipped."""
+    def test_read_keeps_binary_files_as_bytes(self, tmp_path):
+        """Test that files that can't be decoded are returned as bytes."""
         text_file = tmp_path / "text.txt"
         text_file.write_text("text content", encoding="utf-8")
 
@@ -96,9 +101,9 @@ class TestReadConfigDir:
 
         result = read(str(tmp_path))
 
-        assert len(result) == 1
-        assert "text.txt" in result
-        assert "binary.bin" not in result
+        assert len(result) == 2
+        assert result["text.txt"] == "text content"
+        assert result["binary.bin"] == b'\x80\x81\x82\x83'
 
     def test_read_raises_error_for_nonexistent_directory(self):
         """Test that FileNotFoundError is raised for nonexistent directory."""
@@ -204,3 +209,225 @@ class TestConfigDirConstant:
         importlib.reload(configmap_reader.config_dir)
 
         assert configmap_reader.config_dir.CONFIG_DIR == "/custom/config/path"
+
+
+def _kubelet_mount(root, generation, files):
+    """Build a ConfigMap volume layout like the kubelet does."""
+    snapshot = root / f"..{generation}"
+    snapshot.mkdir()
+    for name, content in files.items():
+        (snapshot / name).write_text(content, encoding="utf-8")
+    data_link = root / "..data"
+    tmp_link = root / "..data_tmp"
+    tmp_link.symlink_to(snapshot.name)
+    tmp_link.replace(data_link)
+    for name in files:
+        link = root / name
+        if not link.is_symlink():
+            link.symlink_to(f"..data/{name}")
+
+
+class TestScanConfigDir:
+    """Test cases for the scan() function in config_dir module."""
+
+    def test_scan_reports_added_files(self, tmp_path):
+        """Test that the first scan reports every file as added."""
+        (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+        (tmp_path / "b.txt").write_text("b", encoding="utf-8")
+
+        result = scan(str(tmp_path))
+
+        assert result.data == {"a.txt": "a", "b.txt": "b"}
+        assert result.added == ["a.txt", "b.txt"]
+        assert result.modified == []
+        assert result.removed == []
+
+    def test_scan_reports_diff(self, tmp_path):
+        """Test that later scans report what changed."""
+        (tmp_path / "keep.txt").write_text("same", encoding="utf-8")
+        (tmp_path / "change.txt").write_text("old", encoding="utf-8")
+        (tmp_path / "remove.txt").write_text("gone", encoding="utf-8")
+        scan(str(tmp_path))
+
+        (tmp_path / "change.txt").write_text("new content", encoding="utf-8")
+        (tmp_path / "remove.txt").unlink()
+        (tmp_path / "add.txt").write_text("added", encoding="utf-8")
+        result = scan(str(tmp_path))
+
+        assert result.data == {
+            "keep.txt": "same",
+            "change.txt": "new content",
+            "add.txt": "added",
+        }
+        assert result.added == ["add.txt"]
+        assert result.modified == ["change.txt"]
+        assert result.removed == ["remove.txt"]
+
+    def test_scan_skips_unchanged_files(self, tmp_path):
+        """Test that files with the same inode, mtime and size are not read."""
+        (tmp_path / "a.txt").write_text("a", encoding="utf-8")
+        (tmp_path / "b.txt").write_text("b", encoding="utf-8")
+        scan(str(tmp_path))
+
+        with patch(
+            "configmap_reader.config_dir._read_file"
+        ) as mock_read_file:
+            result = scan(str(tmp_path))
+
+        mock_read_file.assert_not_called()
+        assert result.data == {"a.txt": "a", "b.txt": "b"}
+        assert result.added == result.modified == result.removed == []
+
+    def test_scan_reads_changed_files_in_parallel(self, tmp_path):
+        """Test that several changed files are read on a thread pool."""
+        for i in range(20):
+            (tmp_path / f"f{i}").write_text(str(i), encoding="utf-8")
+
+        with patch(
+            "configmap_reader.config_dir.ThreadPoolExecutor",
+            wraps=ThreadPoolExecutor,
+        ) as mock_pool:
+            result = scan(str(tmp_path), max_workers=3)
+
+        mock_pool.assert_called_once_with(max_workers=3)
+        assert result.data == {f"f{i}": str(i) for i in range(20)}
+
+    def test_scan_sequential_with_one_worker(self, tmp_path):
+        """Test that no pool is created with a single worker."""
+        for i in range(20):
+            (tmp_path / f"f{i}").write_text(str(i), encoding="utf-8")
+
+        with patch(
+            "configmap_reader.config_dir.ThreadPoolExecutor"
+        ) as mock_pool:
+            result = scan(str(tmp_path), max_workers=1)
+
+        mock_pool.assert_not_called()
+        assert len(result.data) == 20
+
+    def test_scan_sequential_for_few_changes(self, tmp_path):
+        """Test that no pool is created for a handful of changed files."""
+        (tmp_path / "a").write_text("a", encoding="utf-8")
+        (tmp_path / "b").write_text("b", encoding="utf-8")
+
+        with patch(
+            "configmap_reader.config_dir.ThreadPoolExecutor"
+        ) as mock_pool:
+            result = scan(str(tmp_path), max_workers=4)
+
+        mock_pool.assert_not_called()
+        assert result.data == {"a": "a", "b": "b"}
+
+    def test_scan_resolves_kubelet_data_dir(self, tmp_path):
+        """Test that keys come from the ..data snapshot directory."""
+        _kubelet_mount(tmp_path, "2024_01_01", {"statusCode": "200"})
+
+        result = scan(str(tmp_path))
+
+        assert result.data == {"statusCode": "200"}
+
+    def test_scan_follows_kubelet_generation_swap(self, tmp_path):
+        """Test that an atomic ..data swap is picked up as one change."""
+        _kubelet_mount(tmp_path, "gen1", {"body": "v1", "statusCode": "200"})
+        scan(str(tmp_path))
+
+        _kubelet_mount(tmp_path, "gen2", {"body": "v2", "statusCode": "200"})
+        result = scan(str(tmp_path))
+
+        assert result.data == {"body": "v2", "statusCode": "200"}
+        assert result.modified == ["body"]
+        assert result.added == result.removed == []
+
+    def test_scan_retries_when_data_dir_removed(self, tmp_path):
+        """Test that a swap between resolving and listing is retried."""
+        from configmap_reader import config_dir
+
+        _kubelet_mount(tmp_path, "gen1", {"body": "v1"})
+        resolve = config_dir._resolve
+
+        def swap_after_resolve(path):
+            resolved = resolve(path)
+            if resolved.endswith("..gen1"):
+                _kubelet_mount(tmp_path, "gen2", {"body": "v2"})
+                shutil.rmtree(tmp_path / "..gen1")
+            return resolved
+
+        with patch(
+            "configmap_reader.config_dir._resolve",
+            side_effect=swap_after_resolve,
+        ):
+            result = scan(str(tmp_path))
+
+        assert result.data == {"body": "v2"}
+
+    def test_scan_rescans_when_generation_removed_while_reading(
+        self, tmp_path
+    ):
+        """Test that a swap between listing and reading is rescanned."""
+        from configmap_reader import config_dir
+
+        _kubelet_mount(tmp_path, "gen1", {"body": "v1", "statusCode": "200"})
+        list_config_files = config_dir._list_config_files
+
+        def swap_after_listing(path):
+            files = list_config_files(path)
+            if (tmp_path / "..gen1").exists():
+                _kubelet_mount(
+                    tmp_path, "gen2", {"body": "v2", "statusCode": "201"}
+                )
+                shutil.rmtree(tmp_path / "..gen1")
+            return files
+
+        with patch(
+            "configmap_reader.config_dir._list_config_files",
+            side_effect=swap_after_listing,
+        ):
+            result = scan(str(tmp_path))
+
+        assert result.data == {"body": "v2", "statusCode": "201"}
+
+    def test_scan_binary_file_reported(self, tmp_path):
+        """Test that binary files are part of the data and the diff."""
+        (tmp_path / "binary.bin").write_bytes(b"\x80\x81")
+
+        result = scan(str(tmp_path))
+
+        assert result.data == {"binary.bin": b"\x80\x81"}
+        assert result.added == ["binary.bin"]
+
+    def test_scan_binary_file_not_read_again(self, tmp_path):
+        """Test that unchanged binary files reuse the same bytes object."""
+        (tmp_path / "binary.bin").write_bytes(b"\x80" * 1024)
+
+        first = scan(str(tmp_path)).data["binary.bin"]
+        second = scan(str(tmp_path)).data["binary.bin"]
+
+        assert second is first
+
+    def test_read_raw_reuses_cached_bytes(self, tmp_path):
+        """Test that raw reads hand over the scan cache's bytes objects."""
+        (tmp_path / "body").write_text("x" * 1024)
+        (tmp_path / "binary.bin").write_bytes(b"\x80")
+
+        first = read_raw(str(tmp_path))
+        second = read_raw(str(tmp_path))
+
+        assert first.values == {"body": b"x" * 1024, "binary.bin": b"\x80"}
+        assert first.binary == {"binary.bin"}
+        assert second.values["body"] is first.values["body"]
+
+    def test_read_raw_refuses_before_reading(self, tmp_path):
+        """Test that data over max_bytes is refused from the file sizes."""
+        (tmp_path / "body").write_text("x" * 1024)
+
+        with patch("configmap_reader.config_dir._read_file") as mock_read:
+            with pytest.raises(SnapshotTooLarge):
+                read_raw(str(tmp_path), max_bytes=1000)
+
+        mock_read.assert_not_called()
+        assert read_raw(str(tmp_path), max_bytes=2048).size == 1024
+
+    def test_scan_raises_error_for_nonexistent_directory(self):
+        """Test that FileNotFoundError is raised for nonexistent directory."""
+        with pytest.raises(FileNotFoundError):
+            scan("/nonexistent/path/to/config")
@@ -0,0 +1,151 @@
+import importlib
+import os
+import threading
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from configmap_reader import debug
+
+
+@pytest.fixture
+def client():
+    """Fixture to create a test client with only the debug router."""
+    app = FastAPI()
+    app.include_router(debug.router)
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    """Make sure tracemalloc does not leak into other tests."""
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    debug._last_snapshot = None
+
+
+def _busy_worker(stop):
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+class TestSampleStacks:
+    """Test cases for the stack sampler."""
+
+    def test_sample_stacks_sees_other_threads(self):
+        """Test that stacks of other threads are collected."""
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy_worker, args=(stop,))
+        worker.start()
+        try:
+            counts = debug.sample_stacks(0.05, interval=0.001)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert any("_busy_worker" in stack for stack in counts)
+        assert all(count > 0 for count in counts.values())
+
+    def test_sample_stacks_skips_own_thread(self):
+        """Test that the sampling thread is not part of the output."""
+        counts = debug.sample_stacks(0.02, interval=0.001)
+
+        assert not any("sample_stacks" in stack for stack in counts)
+
+
+class TestProfileEndpoint:
+    """Test cases for the /debug/profile endpoint."""
+
+    @patch("configmap_reader.debug.sample_stacks")
+    def test_profile_returns_collapsed_stacks(self, mock_sample, client):
+        """Test that output is in collapsed-stack format, hottest first."""
+        mock_sample.return_value = {"a;b": 2, "a;b;c": 5}
+
+        response = client.get("/debug/profile?seconds=1")
+
+        assert response.status_code == 200
+        assert response.text == "a;b;c 5\na;b 2\n"
+        mock_sample.assert_called_once_with(1.0)
+
+    def test_profile_rejects_too_long_duration(self, client):
+        """Test that the duration is bounded."""
+        response = client.get("/debug/profile?seconds=3600")
+
+        assert response.status_code == 422
+
+    def test_profile_rejects_concurrent_runs(self, client):
+        """Test that only one profile runs at a time."""
+        debug._profile_lock.acquire()
+        try:
+            response = client.get("/debug/profile?seconds=1")
+        finally:
+            debug._profile_lock.release()
+
+        assert response.status_code == 409
+
+
+class TestMemoryEndpoint:
+    """Test cases for the /debug/memory endpoint."""
+
+    def test_memory_starts_tracing(self, client):
+        """Test that the first call starts tracemalloc."""
+        response = client.get("/debug/memory?limit=5")
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["tracing_started"] is True
+        assert data["diff"] == []
+        assert len(data["top"]) <= 5
+        assert tracemalloc.is_tracing()
+
+    def test_memory_returns_diff_on_second_call(self, client):
+        """Test that later calls diff against the previous snapshot."""
+        client.get("/debug/memory")
+        kept = [bytearray(1024) for _ in range(100)]
+
+        data = client.get("/debug/memory?limit=10").json()
+
+        assert data["tracing_started"] is False
+        assert len(data["diff"]) > 0
+        assert {"location", "size_diff", "count_diff"} <= set(data["diff"][0])
+        assert kept
+
+    def test_memory_stop(self, client):
+        """Test that tracing can be stopped again."""
+        client.get("/debug/memory")
+
+        response = client.delete("/debug/memory")
+
+        assert response.json() == {"status": "stopped"}
+        assert not tracemalloc.is_tracing()
+
+
+class TestDebugEndpointsRegistration:
+    """Test cases for gating the debug endpoints."""
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_debug_endpoints_disabled_by_default(self):
+        """Test that /debug routes are not mounted by default."""
+        from configmap_reader import main
+        importlib.reload(main)
+
+        response = TestClient(main.app).get("/debug/memory")
+
+        assert main.DEBUG_ENDPOINTS is False
+        assert response.status_code == 404
+
+    @patch.dict(os.environ, {"DEBUG_ENDPOINTS": "true"})
+    def test_debug_endpoints_enabled(self):
+        """Test that /debug routes are mounted when enabled."""
+        from configmap_reader import main
+        importlib.reload(main)
+
+        response = TestClient(main.app).get("/debug/memory?limit=1")
+
+        assert main.DEBUG_ENDPOINTS is True
+        assert response.status_code == 200
@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+from configmap_reader import delta
+
+
+def _apply(document, patch: list):
+    """Apply the add, remove and replace operations diff() produces."""
+    document = copy.deepcopy(document)
+    for op in patch:
+        if op["path"] == "":
+            document = copy.deepcopy(op["value"])
+            continue
+        tokens = [
+            token.replace("~1", "/").replace("~0", "~")
+            for token in op["path"].split("/")[1:]
+        ]
+        parent = document
+        for token in tokens[:-1]:
+            parent = parent[int(token) if isinstance(parent, list) else token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            last = int(last)
+        if op["op"] == "remove":
+            del parent[last]
+        elif op["op"] == "add" and isinstance(parent, list):
+            parent.insert(last, copy.deepcopy(op["value"]))
+        else:
+            parent[last] = copy.deepcopy(op["value"])
+    return document
+
+
+class TestDiff:
+    """Test cases for computing JSON Patches."""
+
+    def test_equal_documents(self):
+        """Test that equal documents give an empty patch."""
+        assert delta.diff({"a": [1, {"b": 2}]}, {"a": [1, {"b": 2}]}) == []
+
+    def test_object_changes(self):
+        """Test add, remove and replace of object members."""
+        patch = delta.diff({"a": 1, "b": 2}, {"a": 3, "c": 4})
+
+        assert patch == [
+            {"op": "remove", "path": "/b"},
+            {"op": "replace", "path": "/a", "value": 3},
+            {"op": "add", "path": "/c", "value": 4},
+        ]
+
+    def test_nested_change_only(self):
+        """Test that a deep change only patches that member."""
+        old = {"big": ["x"] * 100, "deep": {"v": 1}}
+        new = {"big": ["x"] * 100, "deep": {"v": 2}}
+
+        assert delta.diff(old, new) == [
+            {"op": "replace", "path": "/deep/v", "value": 2}
+        ]
+
+    def test_array_shrink_removes_from_end(self):
+        """Test that removed items keep earlier indexes valid."""
+        patch = delta.diff([1, 2, 3, 4], [1, 5])
+
+        assert patch == [
+            {"op": "replace", "path": "/1", "value": 5},
+            {"op": "remove", "path": "/3"},
+            {"op": "remove", "path": "/2"},
+        ]
+
+    def test_json_types_are_strict(self):
+        """Test that 1, 1.0 and true are different JSON values."""
+        assert delta.diff({"a": 1}, {"a": True}) != []
+        assert delta.diff({"a": 1}, {"a": 1.0}) != []
+
+    def test_escapes_pointer_tokens(self):
+        """Test that ~ and / in keys are escaped."""
+        patch = delta.diff({}, {"a/b~c": 1})
+
+        assert patch == [{"op": "add", "path": "/a~1b~0c", "value": 1}]
+
+    def test_root_replace(self):
+        """Test that a changed type replaces the whole document."""
+        assert delta.diff({"a": 1}, [1]) == [
+            {"op": "replace", "path": "", "value": [1]}
+        ]
+
+
+class TestRoundTrip:
+    """Test cases for applying computed patches."""
+
+    @pytest.mark.parametrize("old, new", [
+        ({"a": 1, "b": [1, 2, 3]}, {"a": 2, "b": [1], "c": {"d": None}}),
+        ([{"x": 1}, 2], [{"x": 2}, 2, 3, 4]),
+        ({"a/b": {"~": 1}}, {"a/b": {"~": 2}}),
+        ("text", {"a": 1}),
+    ])
+    def test_round_trip(self, old, new):
+        """Test that applying the diff gives the new document."""
+        assert _apply(old, delta.diff(old, new)) == new
@@ -0,0 +1,158 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from configmap_reader import encoding
+from configmap_reader.encoding import EncodedCache
+
+
+@pytest.fixture(autouse=True)
+def clear_available_cache():
+    """Reset the cached module lookups between tests."""
+    encoding.available.cache_clear()
+    yield
+    encoding.available.cache_clear()
+
+
+class TestNegotiate:
+    """Test cases for the negotiate function."""
+
+    @pytest.mark.parametrize("accept", [None, "", "*/*", "application/*"])
+    def test_negotiate_defaults_to_json(self, accept):
+        """Test that missing or wildcard Accept headers give JSON."""
+        assert encoding.negotiate(accept) == encoding.JSON
+
+    def test_negotiate_yaml_alias(self):
+        """Test that YAML aliases map to application/yaml."""
+        assert encoding.negotiate("text/yaml") == encoding.YAML
+
+    def test_negotiate_respects_quality(self):
+        """Test that the highest quality available type wins."""
+        accept = "application/json;q=0.5, application/yaml;q=0.9"
+
+        assert encoding.negotiate(accept) == encoding.YAML
+
+    def test_negotiate_skips_zero_quality(self):
+        """Test that q=0 excludes a media type."""
+        accept = "application/yaml;q=0, application/json;q=0.1"
+
+        assert encoding.negotiate(accept) == encoding.JSON
+
+    def test_negotiate_skips_unavailable_formats(self):
+        """Test that formats without their module installed are skipped."""
+        with patch(
+            "configmap_reader.encoding.importlib.util.find_spec",
+            return_value=None,
+        ):
+            accept = "application/msgpack, application/cbor;q=0.9"
+
+            assert encoding.negotiate(accept) == encoding.JSON
+
+    def test_negotiate_unknown_type_falls_back_to_json(self):
+        """Test that unsupported types fall back to JSON."""
+        assert encoding.negotiate("text/html") == encoding.JSON
+
+    def test_negotiate_invalid_quality(self):
+        """Test that a malformed q value is ignored as q=0."""
+        accept = "application/yaml;q=abc"
+
+        assert encoding.negotiate(accept) == encoding.JSON
+
+
+class TestParseAndEncode:
+    """Test cases for parse and encode."""
+
+    def test_parse_json(self):
+        """Test that JSON bodies are parsed."""
+        assert encoding.parse('{"a": [1, 2]}') == {"a": [1, 2]}
+
+    def test_parse_text(self):
+        """Test that non-JSON bodies are marked as text."""
+        assert encoding.parse("plain text") is encoding.TEXT
+
+    def test_encode_json_matches_json_response(self):
+        """Test that JSON output is compact and keeps unicode."""
+        content = encoding.encode({"msg": "世界", "n": 1}, encoding.JSON)
+
+        assert content == '{"msg":"世界","n":1}'.encode("utf-8")
+
+    def test_encode_yaml(self):
+        """Test YAML encoding."""
+        yaml = pytest.importorskip("yaml")
+
+        content = encoding.encode({"a": 1}, encoding.YAML)
+
+        assert yaml.safe_load(content) == {"a": 1}
+
+    def test_encode_msgpack(self):
+        """Test MessagePack encoding."""
+        msgpack = pytest.importorskip("msgpack")
+
+        content = encoding.encode({"a": 1}, encoding.MSGPACK)
+
+        assert msgpack.unpackb(content) == {"a": 1}
+
+    def test_encode_cbor(self):
+        """Test CBOR encoding."""
+        cbor2 = pytest.importorskip("cbor2")
+
+        content = encoding.encode({"a": 1}, encoding.CBOR)
+
+        assert cbor2.loads(content) == {"a": 1}
+
+
+class TestEncodedCache:
+    """Test cases for the EncodedCache class."""
+
+    def test_get_missing(self):
+        """Test lookup of an entry that was never stored."""
+        assert EncodedCache(4).get("v1", encoding.JSON) is None
+
+    def test_put_and_get(self):
+        """Test that entries are keyed by version and media type."""
+        cache = EncodedCache(4)
+        cache.put("v1", encoding.JSON, b"{}")
+
+        assert cache.get("v1", encoding.JSON) == b"{}"
+        assert cache.get("v1", encoding.YAML) is None
+        assert cache.get("v2", encoding.JSON) is None
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays bounded."""
+        cache = EncodedCache(2)
+        cache.put("v1", encoding.JSON, b"1")
+        cache.put("v2", encoding.JSON, b"2")
+        cache.get("v1", encoding.JSON)
+        cache.put("v3", encoding.JSON, b"3")
+
+        assert cache.get("v1", encoding.JSON) == b"1"
+        assert cache.get("v2", encoding.JSON) is None
+
+    def test_evicts_beyond_max_bytes(self):
+        """Test that the cache stays within its byte limit."""
+        cache = EncodedCache(10, max_bytes=250)
+        cache.put("v1", encoding.JSON, b"1" * 100)
+        cache.put("v2", encoding.JSON, b"2" * 100)
+        cache.put("v3", encoding.JSON, b"3" * 100)
+
+        assert cache.get("v1", encoding.JSON) is None
+        assert cache.get("v3", encoding.JSON) is not None
+        assert cache.nbytes == 200
+
+    def test_entry_larger_than_max_bytes_not_stored(self):
+        """Test that one oversized body doesn't empty the cache."""
+        cache = EncodedCache(10, max_bytes=100)
+        cache.put("v1", encoding.JSON, b"1" * 50)
+        cache.put("v2", encoding.JSON, b"2" * 500)
+
+        assert cache.get("v1", encoding.JSON) is not None
+        assert cache.get("v2", encoding.JSON) is None
+        assert cache.nbytes == 50
+
+    def test_disabled_cache(self):
+        """Test that a size of 0 stores nothing."""
+        cache = EncodedCache(0)
+        cache.put("v1", encoding.JSON, json.dumps({}).encode())
+
+        assert cache.get("v1", encoding.JSON) is None
@@ -0,0 +1,187 @@
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+
+from configmap_reader import config_api
+from configmap_reader.fake_apiserver import FakeApiServer
+
+
+class TestFakeApiServerReads:
+    """Test GET and LIST through the real kubernetes client."""
+
+    def test_config_api_read(self, fake_k8s_client):
+        """Test that config_api.read works over HTTP."""
+        fake_k8s_client.set_configmap(
+            "default", "my-config", {"statusCode": "200", "body": "{}"}
+        )
+
+        result = config_api.read("my-config", "default")
+
+        assert result == {"statusCode": "200", "body": "{}"}
+        assert fake_k8s_client.request_count == 1
+
+    def test_config_api_read_binary_data(self, fake_k8s_client):
+        """Test that binaryData comes back as bytes over HTTP."""
+        fake_k8s_client.set_configmap(
+            "default", "bin", {"statusCode": "200"}, {"body": b"\x00\xff"}
+        )
+
+        result = config_api.read("bin", "default")
+
+        assert result == {"statusCode": "200", "body": b"\x00\xff"}
+
+    def test_config_api_read_not_found(self, fake_k8s_client):
+        """Test that a missing ConfigMap surfaces as a read error."""
+        with pytest.raises(HTTPException) as exc_info:
+            config_api.read("missing", "default")
+
+        assert exc_info.value.status_code == 500
+        assert "Not Found" in exc_info.value.detail
+
+    def test_config_api_read_many(self, fake_k8s_client):
+        """Test concurrent batch reads against the fake server."""
+        for i in range(5):
+            fake_k8s_client.set_configmap("default", f"cm-{i}", {"i": str(i)})
+
+        result = config_api.read_many(
+            [f"cm-{i}" for i in range(5)], "default"
+        )
+
+        assert result == {f"cm-{i}": {"i": str(i)} for i in range(5)}
+
+    def test_list_has_resource_versions(self, fake_apiserver):
+        """Test that LIST returns items and the current resourceVersion."""
+        fake_apiserver.set_configmap("a", "one", {"k": "1"})
+        fake_apiserver.set_configmap("b", "two", {"k": "2"})
+        api = fake_apiserver.core_v1_api()
+
+        namespaced = api.list_namespaced_config_map("a")
+        everything = api.list_config_map_for_all_namespaces()
+
+        assert [cm.metadata.name for cm in namespaced.items] == ["one"]
+        assert len(everything.items) == 2
+        assert everything.metadata.resource_version == "2"
+
+    def test_update_bumps_resource_version(self, fake_apiserver):
+        """Test that every write gets a new resourceVersion."""
+        first = fake_apiserver.set_configmap("ns", "cm", {"v": "1"})
+        second = fake_apiserver.set_configmap("ns", "cm", {"v": "2"})
+        api = fake_apiserver.core_v1_api()
+
+        cm = api.read_namespaced_config_map("cm", "ns")
+
+        assert int(second) > int(first)
+        assert cm.metadata.resource_version == second
+        assert cm.data == {"v": "2"}
+
+
+class TestFakeApiServerWatch:
+    """Test WATCH semantics of the fake server."""
+
+    def test_watch_streams_events_since_version(self, fake_apiserver):
+        """Test that a watch replays events after its resourceVersion."""
+        rv = fake_apiserver.set_configmap("ns", "cm", {"v": "1"})
+        fake_apiserver.set_configmap("ns", "cm", {"v": "2"})
+        fake_apiserver.delete_configmap("ns", "cm")
+        api = fake_apiserver.core_v1_api()
+
+        events = list(watch.Watch().stream(
+            api.list_namespaced_config_map,
+            "ns",
+            resource_version=rv,
+            timeout_seconds=1,
+        ))
+
+        assert [e["type"] for e in events] == ["MODIFIED", "DELETED"]
+        assert events[0]["object"].data == {"v": "2"}
+
+    def test_watch_receives_live_updates(self, fake_apiserver):
+        """Test that changes made during a watch are delivered."""
+        rv = fake_apiserver.set_configmap("ns", "cm", {"v": "1"})
+        events = fake_apiserver.watch("ns", int(rv), timeout=2)
+
+        fake_apiserver.set_configmap("ns", "cm", {"v": "2"})
+
+        kind, obj = next(events)
+        assert kind == "MODIFIED"
+        assert obj["data"] == {"v": "2"}
+
+    def test_watch_expired_resource_version(self):
+        """Test that positions older than the event window get 410."""
+        with FakeApiServer(event_window=2) as server:
+            for i in range(5):
+                server.set_configmap("ns", "cm", {"v": str(i)})
+            api = server.core_v1_api()
+
+            with pytest.raises(ApiException) as exc_info:
+                list(watch.Watch().stream(
+                    api.list_namespaced_config_map,
+                    "ns",
+                    resource_version="1",
+                    timeout_seconds=1,
+                ))
+
+        assert exc_info.value.status == 410
+
+    def test_watch_times_out(self, fake_apiserver):
+        """Test that an idle watch ends after timeoutSeconds."""
+        events = fake_apiserver.watch("ns", None, timeout=0.1)
+
+        assert list(events) == []
+
+
+class TestFakeApiServerFaults:
+    """Test latency, error and churn injection."""
+
+    def test_error_rate(self):
+        """Test that injected errors fail config_api.read."""
+        with FakeApiServer(error_rate=1.0) as server:
+            server.set_configmap("ns", "cm", {"k": "v"})
+            with patch.object(config_api, "_k8s_client", server.core_v1_api()):
+                config_api._cache.clear()
+                config_api._failures.clear()
+                with pytest.raises(HTTPException) as exc_info:
+                    config_api.read("cm", "ns")
+                config_api._cache.clear()
+                config_api._failures.clear()
+
+        assert "injected error" in exc_info.value.detail
+
+    def test_latency(self):
+        """Test that latency is added to every response."""
+        with FakeApiServer(latency=0.2) as server:
+            server.set_configmap("ns", "cm", {"k": "v"})
+            api = server.core_v1_api()
+
+            start = time.monotonic()
+            api.read_namespaced_config_map("cm", "ns")
+
+        assert time.monotonic() - start >= 0.2
+
+    def test_churn_updates_configmaps(self):
+        """Test that churn keeps changing ConfigMaps."""
+        with FakeApiServer(churn_interval=0.01) as server:
+            server.set_configmap("ns", "cm", {"k": "v"})
+            deadline = time.monotonic() + 2
+            while server.resource_version < 4:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            data = server.get_configmap("ns", "cm")["data"]
+
+        assert data["k"] == "v"
+        assert "churn" in data
+
+
+class TestPytestPlugin:
+    """Test cases for the fixtures shipped as a pytest plugin."""
+
+    def test_plugin_registered_by_entry_point(self, pytestconfig):
+        """Test that the package registers its fixtures with pytest."""
+        plugin = pytestconfig.pluginmanager.get_plugin("configmap_reader")
+
+        assert plugin.__name__ == "configmap_reader.pytest_plugin"
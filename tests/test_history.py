@@ -0,0 +1,111 @@
+import hashlib
+
+from configmap_reader.history import History
+from configmap_reader.snapshot import version_of
+
+
+class TestHistoryRecord:
+    """Test cases for recording versions."""
+
+    def test_record_returns_stable_version(self):
+        """Test that identical content maps to the same version."""
+        history = History(5, 1024 * 1024)
+
+        v1 = history.record({"statusCode": "200", "body": "a"})
+        v2 = history.record({"body": "a", "statusCode": "200"})
+
+        assert v1 == v2
+        assert len(history.versions()) == 1
+
+    def test_record_new_version_on_change(self):
+        """Test that changed content creates a new version."""
+        history = History(5, 1024 * 1024)
+
+        v1 = history.record({"body": "a"})
+        v2 = history.record({"body": "b"})
+
+        assert v1 != v2
+        versions = history.versions()
+        assert [v["version"] for v in versions] == [v2, v1]
+        assert history.get(v1).to_dict() == {"body": "a"}
+        assert history.get(v2).to_dict() == {"body": "b"}
+
+    def test_record_deduplicates_unchanged_values(self):
+        """Test that unchanged keys are stored only once."""
+        history = History(5, 1024 * 1024)
+        large = "x" * 10000
+
+        history.record({"large": large, "small": "1"})
+        after_first = history.memory
+        history.record({"large": large, "small": "2"})
+
+        assert history.memory - after_first < len(large)
+        assert len(history._blobs) == 3
+
+    def test_record_back_to_older_version(self):
+        """Test that a rollback moves the old version to the front."""
+        history = History(5, 1024 * 1024)
+
+        v1 = history.record({"body": "a"})
+        history.record({"body": "b"})
+        history.record({"body": "a"})
+
+        assert history.versions()[0]["version"] == v1
+        assert len(history.versions()) == 2
+
+    def test_record_with_history_disabled(self):
+        """Test that size 0 keeps nothing but still computes versions."""
+        history = History(0, 1024 * 1024)
+
+        version = history.record({"body": "a"})
+
+        digest = hashlib.sha256(b"a").hexdigest()
+        assert version == version_of({"body": digest})
+        assert history.versions() == []
+        assert history.get(version) is None
+
+
+class TestHistoryEviction:
+    """Test cases for evicting old versions."""
+
+    def test_evicts_oldest_when_full(self):
+        """Test that the ring buffer keeps only the last N versions."""
+        history = History(2, 1024 * 1024)
+
+        v1 = history.record({"body": "1"})
+        v2 = history.record({"body": "2"})
+        v3 = history.record({"body": "3"})
+
+        assert history.get(v1) is None
+        assert [v["version"] for v in history.versions()] == [v3, v2]
+
+    def test_evicts_oldest_over_memory_budget(self):
+        """Test that the memory budget evicts oldest versions first."""
+        history = History(10, 15000)
+
+        v1 = history.record({"body": "a" * 10000})
+        v2 = history.record({"body": "b" * 10000})
+
+        assert history.get(v1) is None
+        assert history.get(v2) is not None
+        assert history.memory < 15000
+
+    def test_keeps_latest_even_over_budget(self):
+        """Test that the current version is never evicted."""
+        history = History(10, 10)
+
+        version = history.record({"body": "a" * 1000})
+
+        assert history.get(version).to_dict() == {"body": "a" * 1000}
+
+    def test_shared_values_survive_eviction(self):
+        """Test that values still referenced are not freed."""
+        history = History(2, 1024 * 1024)
+        shared = "s" * 100
+
+        history.record({"shared": shared, "v": "1"})
+        history.record({"shared": shared, "v": "2"})
+        v3 = history.record({"shared": shared, "v": "3"})
+
+        assert history.get(v3).get("shared") == shared
+        assert len(history._blobs) == 3
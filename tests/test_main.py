@@ -1,8 +1,16 @@
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 import json
 import os
+import subprocess
+import sys
+import time
+
+from configmap_reader.encoding import EncodedCache
+from configmap_reader.history import History
+from configmap_reader.snapshot import raw_of
 
 
 @pytest.fixture
@@ -23,18 +31,33 @@ class TestHealthEndpoint:
         assert response.json() == {"status": "ok"}
 
 
+class TestMetricsEndpoint:
+    """Test cases for the /metrics endpoint."""
+
+    def test_metrics_renders_prometheus_text(self, client):
+        """Test that metrics are exposed in text format."""
+        from configmap_reader import metrics
+        metrics.inc("configmap_reader_test_total")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "configmap_reader_test_total 1" in response.text
+        assert response.headers["content-type"].startswith("text/plain")
+
+
 class TestGetConfigEndpointVolumeMode:
     """Test cases for the /config endpoint in volume mode."""
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     @patch("configmap_reader.main.CONFIG_DIR", "/test/config")
     def test_config_returns_json_response(self, mock_read, client):
         """Test successful JSON response from config."""
         body_content = '{"message": "success", "data": {"key": "value"}}'
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": body_content
-        }
+        })
 
         response = client.get("/config")
 
@@ -43,13 +66,13 @@ class TestGetConfigEndpointVolumeMode:
         assert response.json() == data
         mock_read.assert_called_once()
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_returns_plain_text_response(self, mock_read, client):
         """Test successful plain text response from config."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": "Plain text response"
-        }
+        })
 
         response = client.get("/config")
 
@@ -58,33 +81,33 @@ class TestGetConfigEndpointVolumeMode:
         content_type = "text/plain; charset=utf-8"
         assert response.headers["content-type"] == content_type
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_returns_custom_status_code(self, mock_read, client):
         """Test that custom status codes are respected."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "201",
             "body": '{"created": true}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 201
         assert response.json() == {"created": True}
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_returns_error_status_code(self, mock_read, client):
         """Test that error status codes are handled correctly."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "404",
             "body": '{"error": "not found"}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 404
         assert response.json() == {"error": "not found"}
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_file_not_found_error(self, mock_read, client):
         """Test handling of FileNotFoundError from config_dir.read."""
         mock_read.side_effect = FileNotFoundError("Config directory not found")
@@ -94,7 +117,7 @@ class TestGetConfigEndpointVolumeMode:
         assert response.status_code == 500
         assert "Config directory not found" in response.json()["detail"]
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_non_dict_data(self, mock_read, client):
         """Test error when config data is not a dictionary."""
         mock_read.return_value = "invalid data"
@@ -104,44 +127,44 @@ class TestGetConfigEndpointVolumeMode:
         assert response.status_code == 500
         assert response.json()["detail"] == "Invalid config data"
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_missing_status_code(self, mock_read, client):
         """Test error when statusCode is missing."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "body": '{"message": "test"}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 500
         assert "Missing required keys" in response.json()["detail"]
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_missing_body(self, mock_read, client):
         """Test error when body is missing."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200"
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 500
         assert "Missing required keys" in response.json()["detail"]
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_invalid_status_code(self, mock_read, client):
         """Test error when statusCode cannot be converted to int."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "invalid",
             "body": '{"message": "test"}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 500
         assert response.json()["detail"] == "Invalid statusCode value"
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_complex_json(self, mock_read, client):
         """Test handling of complex nested JSON."""
         complex_data = {
@@ -154,129 +177,891 @@ class TestGetConfigEndpointVolumeMode:
                 "page": 1
             }
         }
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": json.dumps(complex_data)
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 200
         assert response.json() == complex_data
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_handles_multiline_plain_text(self, mock_read, client):
         """Test handling of multiline plain text."""
         text_content = "Line 1\nLine 2\nLine 3"
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": text_content
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 200
         assert response.text == text_content
 
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_status_code_as_integer(self, mock_read, client):
         """Test that statusCode works when already an integer."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": 204,
             "body": ""
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 204
 
 
+class TestServerTiming:
+    """Test cases for the Server-Timing header on /config."""
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.main.SERVER_TIMING", True)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_server_timing_header_present(self, mock_read, client):
+        """Test that all phases are reported when enabled."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+
+        response = client.get("/config")
+
+        header = response.headers["server-timing"]
+        phases = [part.split(";")[0] for part in header.split(", ")]
+        assert phases == ["read", "validate", "parse", "encode"]
+        assert 'read;desc="volume"' in header
+
+    @patch("configmap_reader.main.SERVER_TIMING", False)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_server_timing_header_absent_by_default(self, mock_read, client):
+        """Test that no header is added when disabled."""
+        mock_read.return_value = raw_of({"statusCode": "200", "body": "text"})
+
+        response = client.get("/config")
+
+        assert "server-timing" not in response.headers
+
+    @patch("configmap_reader.main.TIMING_LOG_SAMPLE_RATE", 1.0)
+    @patch("configmap_reader.main.timing.log_sampled")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_timing_log_called(self, mock_read, mock_log, client):
+        """Test that the sampled timing log receives request fields."""
+        mock_read.return_value = raw_of({"statusCode": "201", "body": "text"})
+
+        client.get("/config")
+
+        args, kwargs = mock_log.call_args
+        assert args[1] == 1.0
+        assert kwargs["status"] == 201
+        assert kwargs["path"] == "/config"
+
+
+class TestConfigHistory:
+    """Test cases for /config/history and /config?version=."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_history(self):
+        with patch(
+            "configmap_reader.main.config_history", History(5, 1024 * 1024)
+        ):
+            yield
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_returns_version_header(self, mock_read, client):
+        """Test that each response carries its version id."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 1}'}
+        )
+
+        response = client.get("/config")
+
+        assert len(response.headers["x-config-version"]) == 16
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_history_lists_versions(self, mock_read, client):
+        """Test that changed content shows up in the history."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 1}'}
+        )
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 2}'}
+        )
+        v2 = client.get("/config").headers["x-config-version"]
+
+        response = client.get("/config/history")
+
+        versions = [v["version"] for v in response.json()["versions"]]
+        assert versions == [v2, v1]
+        assert response.json()["memory_bytes"] > 0
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_serves_older_version(self, mock_read, client):
+        """Test that an older version can be served without a read."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 1}'}
+        )
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of(
+            {"statusCode": "201", "body": '{"v": 2}'}
+        )
+        client.get("/config")
+        mock_read.reset_mock()
+
+        response = client.get(f"/config?version={v1}")
+
+        assert response.status_code == 200
+        assert response.json() == {"v": 1}
+        assert response.headers["x-config-version"] == v1
+        mock_read.assert_not_called()
+
+    def test_config_unknown_version(self, client):
+        """Test that unknown versions return 404."""
+        response = client.get("/config?version=deadbeef")
+
+        assert response.status_code == 404
+        assert "Version not found" in response.json()["detail"]
+
+
 class TestGetConfigEndpointApiMode:
     """Test cases for the /config endpoint in API mode."""
 
     @patch("configmap_reader.main.READ_MODE", "api")
     @patch("configmap_reader.main.CONFIGMAP_NAME", "my-config")
     @patch("configmap_reader.main.K8S_NAMESPACE", "default")
-    @patch("configmap_reader.main.config_api.read")
+    @patch("configmap_reader.config_api.read_raw")
     def test_config_uses_api_mode(self, mock_read, client):
         """Test that API mode is used when READ_MODE is 'api'."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": '{"mode": "api"}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 200
         assert response.json() == {"mode": "api"}
-        mock_read.assert_called_once_with("my-config", "default")
+        mock_read.assert_called_once_with(
+            "my-config", "default", max_bytes=32 * 1024 * 1024
+        )
 
     @patch("configmap_reader.main.READ_MODE", "api")
     @patch("configmap_reader.main.CONFIGMAP_NAME", "test-config")
     @patch("configmap_reader.main.K8S_NAMESPACE", "test-ns")
-    @patch("configmap_reader.main.config_api.read")
+    @patch("configmap_reader.config_api.read_raw")
     def test_config_api_mode_case_insensitive(self, mock_read, client):
         """Test that READ_MODE is case insensitive."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": '{"test": "value"}'
-        }
+        })
 
         response = client.get("/config")
 
         assert response.status_code == 200
-        mock_read.assert_called_once_with("test-config", "test-ns")
+        mock_read.assert_called_once_with(
+            "test-config", "test-ns", max_bytes=32 * 1024 * 1024
+        )
 
     @patch("configmap_reader.main.READ_MODE", "api")
     @patch("configmap_reader.main.CONFIGMAP_NAME", "my-config")
     @patch("configmap_reader.main.K8S_NAMESPACE", "custom-ns")
-    @patch("configmap_reader.main.config_api.read")
+    @patch("configmap_reader.config_api.read_raw")
     def test_config_uses_namespace_env_var(self, mock_read, client):
         """Test that NAMESPACE environment variable is used."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": '{"namespace": "custom-ns"}'
-        }
+        })
+
+        client.get("/config")
+
+        mock_read.assert_called_once_with(
+            "my-config", "custom-ns", max_bytes=32 * 1024 * 1024
+        )
+
+
+class TestContentNegotiation:
+    """Test cases for Accept-based encoding of /config."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        with patch(
+            "configmap_reader.main.encoded_bodies", EncodedCache(8)
+        ):
+            yield
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_serves_yaml(self, mock_read, client):
+        """Test that a YAML Accept header returns YAML."""
+        yaml = pytest.importorskip("yaml")
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+
+        response = client.get(
+            "/config", headers={"Accept": "application/yaml"}
+        )
+
+        assert response.headers["content-type"] == "application/yaml"
+        assert response.headers["vary"] == "Accept"
+        assert yaml.safe_load(response.content) == {"a": 1}
+
+    @patch("configmap_reader.main.encoding.encode")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_encodes_once_per_version(
+        self, mock_read, mock_encode, client
+    ):
+        """Test that encoded bytes are reused for the same version."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+        mock_encode.return_value = b'{"a":1}'
+
+        first = client.get("/config")
+        second = client.get("/config")
+
+        assert first.content == second.content == b'{"a":1}'
+        mock_encode.assert_called_once()
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_encoded_cache_bytes_gauge(self, mock_read, client):
+        """Test that cached encoded bodies are counted in a gauge."""
+        from configmap_reader import metrics
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
 
         client.get("/config")
 
-        mock_read.assert_called_once_with("my-config", "custom-ns")
+        assert metrics.get("configmap_reader_encoded_cache_bytes") == len(
+            b'{"a":1}'
+        )
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_text_body_ignores_accept(self, mock_read, client):
+        """Test that plain text bodies are always served as text."""
+        mock_read.return_value = raw_of({"statusCode": "200", "body": "hello"})
+
+        response = client.get(
+            "/config", headers={"Accept": "application/yaml"}
+        )
+
+        assert response.text == "hello"
+        assert response.headers["content-type"].startswith("text/plain")
+
+
+class TestFieldProjection:
+    """Test cases for /config?fields=."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        with patch(
+            "configmap_reader.main.projected_bodies", EncodedCache(8)
+        ):
+            yield
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_returns_selected_fields(self, mock_read, client):
+        """Test that only the selected subtrees are returned."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200",
+            "body": '{"a": {"b": 1, "c": 2}, "d": [1, 2]}',
+        })
+
+        response = client.get("/config?fields=a.b,/d")
+
+        assert response.status_code == 200
+        assert response.json() == {"a": {"b": 1}, "d": [1, 2]}
+
+    @patch("configmap_reader.main.projection.project")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_projection_cached_per_version(
+        self, mock_read, mock_project, client
+    ):
+        """Test that a projection is computed once per version."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+        mock_project.return_value = {"a": 1}
+
+        client.get("/config?fields=a")
+        response = client.get("/config?fields=a")
+
+        assert response.json() == {"a": 1}
+        mock_project.assert_called_once()
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_projection_requires_json(self, mock_read, client):
+        """Test that text bodies can't be projected."""
+        mock_read.return_value = raw_of({"statusCode": "200", "body": "text"})
+
+        response = client.get("/config?fields=a")
+
+        assert response.status_code == 400
+        assert "requires a JSON body" in response.json()["detail"]
+
+    def test_config_projection_empty_fields(self, client):
+        """Test that an empty field list is rejected."""
+        response = client.get("/config?fields=,")
+
+        assert response.status_code == 400
+
+
+class TestBinaryBody:
+    """Test cases for bytes bodies on /config."""
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_serves_octet_stream(self, mock_read, client):
+        """Test that a bytes body is served as-is."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": b"\x00\xff"}
+        )
+
+        response = client.get(
+            "/config", headers={"Accept": "application/yaml"}
+        )
+
+        assert response.status_code == 200
+        assert response.content == b"\x00\xff"
+        content_type = response.headers["content-type"]
+        assert content_type == "application/octet-stream"
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_binary_projection_rejected(self, mock_read, client):
+        """Test that bytes bodies can't be projected."""
+        mock_read.return_value = raw_of({"statusCode": "200", "body": b"\x00"})
+
+        response = client.get("/config?fields=a")
+
+        assert response.status_code == 400
+
+    @patch("configmap_reader.main.READ_MODE", "api")
+    @patch("configmap_reader.config_api.read_many")
+    def test_configs_binary_body_base64(self, mock_read, client):
+        """Test that batch results carry bytes bodies as base64."""
+        mock_read.return_value = {
+            "a": {"statusCode": "200", "body": b"\x00\xff"},
+        }
+
+        response = client.get("/configs?names=a")
+
+        assert response.json()["configs"]["a"] == {
+            "status": "ok",
+            "statusCode": 200,
+            "body": "AP8=",
+            "bodyEncoding": "base64",
+        }
+
+
+class TestConfigDelta:
+    """Test cases for /config/delta."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_state(self):
+        with patch(
+            "configmap_reader.main.config_history", History(5, 1024 * 1024)
+        ), patch(
+            "configmap_reader.main.delta_patches", EncodedCache(8)
+        ):
+            yield
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_returns_patch(self, mock_read, client):
+        """Test that a kept base version gets a JSON Patch."""
+        large = ["x" * 10] * 100
+        mock_read.return_value = raw_of({
+            "statusCode": "200",
+            "body": json.dumps({"large": large, "v": 1}),
+        })
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of({
+            "statusCode": "200",
+            "body": json.dumps({"large": large, "v": 2}),
+        })
+
+        response = client.get(f"/config/delta?since={v1}")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == (
+            "application/json-patch+json"
+        )
+        assert response.headers["x-config-delta"] == "patch"
+        assert response.headers["x-config-delta-since"] == v1
+        assert response.json() == [
+            {"op": "replace", "path": "/v", "value": 2}
+        ]
+
+    @patch("configmap_reader.main.delta.diff")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_cached_per_version_pair(
+        self, mock_read, mock_diff, client
+    ):
+        """Test that a patch is computed once per version pair."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": json.dumps({"a": "x" * 100})
+        })
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": json.dumps({"a": "y" * 100})
+        })
+        mock_diff.return_value = [{"op": "replace", "path": "/a"}]
+
+        first = client.get(f"/config/delta?since={v1}")
+        second = client.get(f"/config/delta?since={v1}")
+
+        assert first.content == second.content
+        mock_diff.assert_called_once()
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_unknown_base_serves_full_body(self, mock_read, client):
+        """Test that an unknown base version falls back to the body."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+
+        response = client.get("/config/delta?since=0123456789abcdef")
+
+        assert response.status_code == 200
+        assert response.headers["x-config-delta"] == "full"
+        assert response.json() == {"a": 1}
+        assert "etag" in response.headers
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_full_body_reads_once(self, mock_read, client):
+        """Test that the fallback serves the snapshot already read."""
+        mock_read.side_effect = [
+            raw_of({"statusCode": "200", "body": '{"a": 1}'}),
+            raw_of({"statusCode": "200", "body": '{"a": 2}'}),
+        ]
+
+        response = client.get("/config/delta?since=0123456789abcdef")
+
+        assert response.json() == {"a": 1}
+        assert mock_read.call_count == 1
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_larger_than_body_serves_full_body(
+        self, mock_read, client
+    ):
+        """Test that a patch larger than the body isn't served."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"b": 2}'}
+        )
+
+        response = client.get(f"/config/delta?since={v1}")
+
+        assert response.headers["x-config-delta"] == "full"
+        assert response.json() == {"b": 2}
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_delta_text_body_serves_full_body(self, mock_read, client):
+        """Test that non-JSON bodies are served in full."""
+        mock_read.return_value = raw_of({"statusCode": "200", "body": "hello"})
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": "hello!"}
+        )
+
+        response = client.get(f"/config/delta?since={v1}")
+
+        assert response.headers["x-config-delta"] == "full"
+        assert response.text == "hello!"
+
+
+class TestReloader:
+    """Test cases for serving snapshots rebuilt in the background."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_state(self):
+        with patch(
+            "configmap_reader.main.config_history", History(5, 1024 * 1024)
+        ), patch("configmap_reader.main.RELOAD_DEBOUNCE", 0.05), patch(
+            "configmap_reader.main.RELOAD_POLL_INTERVAL", 0.01
+        ):
+            yield
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_served_from_reloader(self, mock_read, client):
+        """Test that requests use the published snapshot."""
+        from configmap_reader import main
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 1}'}
+        )
+
+        with TestClient(main.app) as live:
+            reloader = main.reloader
+            for _ in range(200):
+                if reloader.current is not None:
+                    break
+                time.sleep(0.01)
+            mock_read.return_value = raw_of({
+                "statusCode": "200", "body": '{"v": 2}'
+            })
+            for _ in range(200):
+                if reloader.current.get("body") == '{"v": 2}':
+                    break
+                time.sleep(0.01)
+            reloader.stop()
+            reads = mock_read.call_count
+
+            response = live.get("/config")
+
+        assert response.json() == {"v": 2}
+        assert mock_read.call_count == reads
+        assert main.reloader is None
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_reloader_publishes_version_without_body(
+        self, mock_read, client
+    ):
+        """Test that removing body is reported as in per-request mode."""
+        from configmap_reader import main
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+
+        with TestClient(main.app) as live:
+            for _ in range(200):
+                if main.reloader.current is not None:
+                    break
+                time.sleep(0.01)
+            mock_read.return_value = raw_of({"statusCode": "200"})
+            for _ in range(200):
+                if "body" not in main.reloader.current:
+                    break
+                time.sleep(0.01)
+
+            response = live.get("/config")
+
+        assert response.status_code == 500
+        assert "Missing required keys" in response.json()["detail"]
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.main.SERVER_TIMING", True)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_reloader_read_timed_as_cache(self, mock_read, client):
+        """Test that Server-Timing reports the published snapshot."""
+        from configmap_reader import main
+        mock_read.return_value = raw_of({"statusCode": "200", "body": "x"})
+
+        with TestClient(main.app) as live:
+            for _ in range(200):
+                if main.reloader.current is not None:
+                    break
+                time.sleep(0.01)
+            response = live.get("/config")
+
+        assert 'read;desc="cache"' in response.headers["server-timing"]
+
+    @patch("configmap_reader.main.RELOAD_POLL_INTERVAL", 0)
+    @patch("configmap_reader.main.READ_MODE", "api")
+    @patch("configmap_reader.config_api.preload")
+    def test_api_mode_polls_at_refresh_interval(self, mock_preload):
+        """Test that api mode doesn't poll the API at the volume rate."""
+        from configmap_reader import main
+
+        with patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 30):
+            assert main._reload_poll_interval() == 30
+        with patch("configmap_reader.config_api.API_REFRESH_INTERVAL", 0):
+            with pytest.raises(RuntimeError, match="API_REFRESH_INTERVAL"):
+                with TestClient(main.app):
+                    pass
+        assert main.reloader is None
+
+    @patch("configmap_reader.main.RELOAD_POLL_INTERVAL", 0)
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    def test_volume_mode_poll_interval_default(self):
+        """Test the default poll interval of volume mode."""
+        from configmap_reader import main
+
+        assert main._reload_poll_interval() == 0.1
+
+    @patch("configmap_reader.main.RELOAD_DEBOUNCE", 0)
+    def test_reloader_disabled_by_default(self, client):
+        """Test that no reloader runs without RELOAD_DEBOUNCE."""
+        from configmap_reader import main
+
+        with TestClient(main.app):
+            assert main.reloader is None
+
+
+class TestBodyTemplates:
+    """Test cases for BODY_TEMPLATES on /config."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_caches(self):
+        with patch(
+            "configmap_reader.main.encoded_bodies", EncodedCache(8)
+        ), patch("configmap_reader.main.BODY_TEMPLATES", True):
+            yield
+
+    @patch.dict(os.environ, {"POD_NAME": "pod-1"})
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_renders_json_template(self, mock_read, client):
+        """Test that JSON bodies get pod and query values."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200",
+            "body": '{"pod": "${pod.name}", "q": "${query.q}"}',
+        })
+
+        response = client.get("/config?q=x")
+
+        assert response.json() == {"pod": "pod-1", "q": "x"}
+        version = response.headers["x-config-version"]
+        assert response.headers["etag"].startswith(f'"{version}-')
+
+    @patch("configmap_reader.main.encoding.parse")
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_compiles_once_per_version(
+        self, mock_read, mock_parse, client
+    ):
+        """Test that rendering doesn't parse the body again."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": '{"q": "${query.q}"}'
+        })
+        mock_parse.return_value = {"q": "${query.q}"}
+
+        first = client.get("/config?q=1")
+        second = client.get("/config?q=2")
+
+        assert first.json() == {"q": "1"}
+        assert second.json() == {"q": "2"}
+        assert first.headers["etag"] != second.headers["etag"]
+        mock_parse.assert_called_once()
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_template_not_modified(self, mock_read, client):
+        """Test that the rendered ETag is revalidated."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": "hello ${query.name}"
+        })
+        first = client.get("/config?name=a")
+
+        same = client.get(
+            "/config?name=a",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        other = client.get(
+            "/config?name=b",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+
+        assert first.text == "hello a"
+        assert first.headers["content-type"].startswith("text/plain")
+        assert same.status_code == 304
+        assert other.status_code == 200
+        assert other.text == "hello b"
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_static_body_unchanged(self, mock_read, client):
+        """Test that bodies without placeholders keep the plain ETag."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"a": 1}'}
+        )
+
+        response = client.get("/config")
+
+        version = response.headers["x-config-version"]
+        assert response.headers["etag"] == f'"{version}"'
+        assert response.json() == {"a": 1}
+
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_template_served_as_json(self, mock_read, client):
+        """Test that templated bodies are JSON whatever the media type."""
+        pytest.importorskip("yaml")
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": '{"q": "${query.q}"}'
+        })
+
+        response = client.get(
+            "/config?q=x", headers={"Accept": "application/yaml"}
+        )
+
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == {"q": "x"}
+
+    @patch("configmap_reader.main.BODY_TEMPLATES", False)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_templates_disabled(self, mock_read, client):
+        """Test that placeholders are served as-is by default."""
+        mock_read.return_value = raw_of({
+            "statusCode": "200", "body": '{"q": "${query.q}"}'
+        })
+
+        response = client.get("/config?q=x")
+
+        assert response.json() == {"q": "${query.q}"}
+
+
+class TestSnapshotBudget:
+    """Test cases for the snapshot memory budget."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_snapshots(self):
+        with patch("configmap_reader.main._accepted", None), patch(
+            "configmap_reader.main.config_history", History(5, 1024 * 1024)
+        ):
+            yield
+
+    @patch("configmap_reader.main.SNAPSHOT_MEMORY_BUDGET", 2000)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_refuses_version_over_budget(self, mock_read, client):
+        """Test that a too large version keeps the last accepted one."""
+        from configmap_reader import metrics
+        refused = metrics.get("configmap_reader_snapshot_refused_total")
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": '{"v": 1}'}
+        )
+        v1 = client.get("/config").headers["x-config-version"]
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": "x" * 5000}
+        )
+
+        response = client.get("/config")
+
+        assert response.status_code == 200
+        assert response.json() == {"v": 1}
+        assert response.headers["x-config-version"] == v1
+        assert metrics.get(
+            "configmap_reader_snapshot_refused_total"
+        ) == refused + 1
+        assert 0 < metrics.get("configmap_reader_snapshot_bytes") <= 2000
+
+    @patch("configmap_reader.main.SNAPSHOT_MEMORY_BUDGET", 100)
+    @patch("configmap_reader.config_dir.read_raw")
+    def test_config_over_budget_without_accepted(self, mock_read, client):
+        """Test that a too large first version is an error."""
+        mock_read.return_value = raw_of(
+            {"statusCode": "200", "body": "x" * 5000}
+        )
+
+        response = client.get("/config")
+
+        assert response.status_code == 500
+        assert "budget" in response.json()["detail"]
+
+
+class TestGetConfigsEndpoint:
+    """Test cases for the /configs batch endpoint."""
+
+    @patch("configmap_reader.main.READ_MODE", "api")
+    @patch("configmap_reader.main.K8S_NAMESPACE", "default")
+    @patch("configmap_reader.config_api.read_many")
+    def test_configs_returns_per_name_results(self, mock_read, client):
+        """Test a batch with successful and failing names."""
+        mock_read.return_value = {
+            "a": {"statusCode": "200", "body": '{"a": 1}'},
+            "b": {"statusCode": "404", "body": "gone"},
+            "c": HTTPException(status_code=500, detail="boom"),
+            "d": {"body": "no status"},
+        }
+
+        response = client.get("/configs?names=a,b, c,d")
+
+        assert response.status_code == 200
+        configs = response.json()["configs"]
+        assert configs["a"] == {
+            "status": "ok", "statusCode": 200, "body": {"a": 1}
+        }
+        assert configs["b"] == {
+            "status": "ok", "statusCode": 404, "body": "gone"
+        }
+        assert configs["c"] == {"status": "error", "error": "boom"}
+        assert configs["d"]["status"] == "error"
+        mock_read.assert_called_once_with(
+            ["a", "b", "c", "d"], "default", max_workers=8
+        )
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    def test_configs_requires_api_mode(self, client):
+        """Test that batch reads are rejected in volume mode."""
+        response = client.get("/configs?names=a")
+
+        assert response.status_code == 400
+
+    @patch("configmap_reader.main.READ_MODE", "api")
+    def test_configs_requires_names(self, client):
+        """Test that an empty name list is rejected."""
+        response = client.get("/configs?names=,")
+
+        assert response.status_code == 400
+
+    @patch("configmap_reader.main.READ_MODE", "api")
+    @patch("configmap_reader.main.BATCH_MAX_NAMES", 2)
+    def test_configs_limits_names(self, client):
+        """Test that the number of names is bounded."""
+        response = client.get("/configs?names=a,b,c")
+
+        assert response.status_code == 400
+        assert "maximum is 2" in response.json()["detail"]
 
 
 class TestRunFunction:
     """Test cases for the run() function."""
 
-    @patch("configmap_reader.main.uvicorn.run")
+    @patch("uvicorn.run")
+    @patch.dict(os.environ, {"PORT": "9000"})
+    def test_run_http2_uses_hypercorn(self, mock_uvicorn):
+        """Test that run(http2=True) serves with tuned hypercorn limits."""
+        pytest.importorskip("hypercorn")
+        from configmap_reader.main import app, run
+
+        with patch(
+            "hypercorn.asyncio.serve", new_callable=AsyncMock
+        ) as mock_serve:
+            run(http2=True)
+
+        mock_uvicorn.assert_not_called()
+        served_app, config = mock_serve.call_args[0]
+        assert served_app is app
+        assert config.bind == ["0.0.0.0:9000"]
+        assert config.keep_alive_timeout == 75
+        assert config.keep_alive_max_requests == 100000
+        assert config.h2_max_concurrent_streams == 100
+
+    @patch("uvicorn.run")
     @patch.dict(os.environ, {"PORT": "9000"})
     def test_run_with_custom_port(self, mock_uvicorn):
         """Test that run() uses custom port from environment."""
-        from configmap_reader.main import run
+        from configmap_reader.main import app, run
 
         run()
 
         mock_uvicorn.assert_called_once_with(
-            "app.main:app",
+            app,
             host="0.0.0.0",
             port=9000,
             reload=False
         )
 
-    @patch("configmap_reader.main.uvicorn.run")
+    @patch("uvicorn.run")
     @patch.dict(os.environ, {}, clear=True)
     def test_run_with_default_port(self, mock_uvicorn):
         """Test that run() uses default port when PORT not set."""
-        from configmap_reader.main import run
+        from configmap_reader.main import app, run
 
         run()
 
         mock_uvicorn.assert_called_once_with(
-            "app.main:app",
+            app,
             host="0.0.0.0",
             port=8000,
             reload=False
         )
 
-    @patch("configmap_reader.main.uvicorn.run")
+    @patch("uvicorn.run")
     def test_run_always_binds_to_all_interfaces(self, mock_uvicorn):
         """Test that run() always binds to 0.0.0.0."""
         from configmap_reader.main import run
@@ -286,7 +1071,7 @@ class TestRunFunction:
         call_args = mock_uvicorn.call_args
         assert call_args[1]["host"] == "0.0.0.0"
 
-    @patch("configmap_reader.main.uvicorn.run")
+    @patch("uvicorn.run")
     def test_run_has_reload_disabled(self, mock_uvicorn):
         """Test that run() has reload disabled."""
         from configmap_reader.main import run
@@ -297,6 +1082,50 @@ class TestRunFunction:
         assert call_args[1]["reload"] is False
 
 
+class TestLazyImports:
+    """Test cases for importing only what the read mode needs."""
+
+    def test_volume_mode_does_not_import_api_modules(self):
+        """Test that volume mode leaves kubernetes and config_api out."""
+        code = (
+            "import sys\n"
+            "import configmap_reader.main\n"
+            "print(sorted(m for m in sys.modules if m in ("
+            "'kubernetes', 'configmap_reader.config_api', 'uvicorn')))\n"
+        )
+        env = dict(os.environ, READ_MODE="volume")
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+
+        assert result.stdout.splitlines()[-1] == "[]"
+
+    @patch("configmap_reader.main.READ_MODE", "api")
+    @patch("configmap_reader.config_api.preload")
+    def test_api_mode_preloads_client_on_startup(self, mock_preload):
+        """Test that api mode creates the client before serving."""
+        from configmap_reader.main import app
+
+        with TestClient(app):
+            pass
+
+        mock_preload.assert_called_once()
+
+    @patch("configmap_reader.main.READ_MODE", "volume")
+    @patch("configmap_reader.config_api.preload")
+    def test_volume_mode_skips_preload(self, mock_preload):
+        """Test that volume mode doesn't create a client."""
+        from configmap_reader.main import app
+
+        with TestClient(app):
+            pass
+
+        mock_preload.assert_not_called()
+
+
 class TestEnvironmentVariableDefaults:
     """Test cases for environment variable defaults."""
 
@@ -342,13 +1171,13 @@ class TestEdgeCases:
     """Test edge cases and error conditions."""
 
     @patch("configmap_reader.main.READ_MODE", "volume")
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_empty_body(self, mock_read, client):
         """Test handling of empty body string."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": ""
-        }
+        })
 
         response = client.get("/config")
 
@@ -356,13 +1185,13 @@ class TestEdgeCases:
         assert response.text == ""
 
     @patch("configmap_reader.main.READ_MODE", "volume")
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_large_status_code(self, mock_read, client):
         """Test handling of large status codes."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "500",
             "body": '{"error": "custom error"}'
-        }
+        })
 
         response = client.get("/config")
 
@@ -370,13 +1199,13 @@ class TestEdgeCases:
         assert response.json() == {"error": "custom error"}
 
     @patch("configmap_reader.main.READ_MODE", "volume")
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_json_array(self, mock_read, client):
         """Test handling of JSON array as body."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": '[1, 2, 3, 4, 5]'
-        }
+        })
 
         response = client.get("/config")
 
@@ -384,13 +1213,13 @@ class TestEdgeCases:
         assert response.json() == [1, 2, 3, 4, 5]
 
     @patch("configmap_reader.main.READ_MODE", "volume")
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_unicode_in_json(self, mock_read, client):
         """Test handling of Unicode characters in JSON."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": '{"message": "Hello 世界 🌍"}'
-        }
+        })
 
         response = client.get("/config")
 
@@ -398,13 +1227,13 @@ class TestEdgeCases:
         assert response.json() == {"message": "Hello 世界 🌍"}
 
     @patch("configmap_reader.main.READ_MODE", "volume")
-    @patch("configmap_reader.main.config_dir.read")
+    @patch("configmap_reader.config_dir.read_raw")
     def test_config_with_special_chars_plain_text(self, mock_read, client):
         """Test handling of special characters in plain text."""
-        mock_read.return_value = {
+        mock_read.return_value = raw_of({
             "statusCode": "200",
             "body": "Special chars: <>&\"'\n\t"
-        }
+        })
 
         response = client.get("/config")
 
@@ -0,0 +1,46 @@
+import pytest
+
+from configmap_reader import metrics
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Start each test without metrics."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestMetrics:
+    """Test cases for the metrics module."""
+
+    def test_inc_counter(self):
+        """Test that counters add up."""
+        metrics.inc("requests_total")
+        metrics.inc("requests_total", 2)
+
+        assert metrics.get("requests_total") == 3
+
+    def test_set_gauge(self):
+        """Test that gauges keep the last value."""
+        metrics.set_gauge("budget", 5)
+        metrics.set_gauge("budget", 2.5)
+
+        assert metrics.get("budget") == 2.5
+
+    def test_get_unknown(self):
+        """Test that unknown metrics read as 0."""
+        assert metrics.get("unknown") == 0
+
+    def test_render_prometheus_format(self):
+        """Test the text exposition format."""
+        metrics.inc("calls_total", help="Calls made")
+        metrics.set_gauge("budget", 5)
+
+        assert metrics.render() == (
+            "# HELP calls_total Calls made\n"
+            "# TYPE calls_total counter\n"
+            "calls_total 1\n"
+            "# TYPE budget gauge\n"
+            "budget 5\n"
+        )
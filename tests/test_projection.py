@@ -0,0 +1,73 @@
+import pytest
+
+from configmap_reader.projection import parse_fields, project
+
+DOCUMENT = {
+    "name": "app",
+    "db": {"host": "db.local", "port": 5432, "auth": {"user": "u"}},
+    "items": [{"id": 1}, {"id": 2}],
+    "a/b": {"~x": 1},
+}
+
+
+class TestParseFields:
+    """Test cases for the parse_fields function."""
+
+    def test_parse_dotted_paths(self):
+        """Test dotted path parsing."""
+        assert parse_fields("db.host,name") == (("name",), ("db", "host"))
+
+    def test_parse_json_pointers(self):
+        """Test JSON Pointer parsing with escapes."""
+        assert parse_fields("/a~1b/~0x") == (("a/b", "~x"),)
+
+    def test_parse_is_canonical(self):
+        """Test that order, spaces and duplicates don't matter."""
+        assert parse_fields(" name , db.host,name") == parse_fields(
+            "/db/host,name"
+        )
+
+    def test_parse_empty(self):
+        """Test that an empty field list is rejected."""
+        with pytest.raises(ValueError):
+            parse_fields(" , ")
+
+
+class TestProject:
+    """Test cases for the project function."""
+
+    def test_project_keeps_nesting(self):
+        """Test that selected subtrees keep their position."""
+        result = project(DOCUMENT, parse_fields("db.host,name"))
+
+        assert result == {"name": "app", "db": {"host": "db.local"}}
+
+    def test_project_subtree(self):
+        """Test that selecting an object keeps all of it."""
+        result = project(DOCUMENT, parse_fields("db.auth"))
+
+        assert result == {"db": {"auth": {"user": "u"}}}
+
+    def test_project_list_index(self):
+        """Test that list indexes select items."""
+        result = project(DOCUMENT, parse_fields("/items/1/id"))
+
+        assert result == {"items": {"1": {"id": 2}}}
+
+    def test_project_missing_paths_left_out(self):
+        """Test that paths that don't exist are skipped."""
+        result = project(DOCUMENT, parse_fields("db.nope,items.9,name.x"))
+
+        assert result == {}
+
+    def test_project_parent_wins_over_child(self):
+        """Test that a parent and its child select the whole parent."""
+        result = project(DOCUMENT, parse_fields("db,db.host"))
+
+        assert result == {"db": DOCUMENT["db"]}
+
+    def test_project_escaped_pointer(self):
+        """Test that escaped pointer segments are resolved."""
+        result = project(DOCUMENT, parse_fields("/a~1b/~0x"))
+
+        assert result == {"a/b": {"~x": 1}}
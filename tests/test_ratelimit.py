@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from configmap_reader.ratelimit import (
+    TokenBucket,
+    decorrelated_jitter,
+    jittered,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Test cases for the TokenBucket class."""
+
+    def test_allows_burst_then_blocks(self):
+        """Test that the bucket starts full and then runs dry."""
+        bucket = TokenBucket(1, 3, clock=FakeClock())
+
+        assert [bucket.try_acquire() for _ in range(4)] == [
+            True, True, True, False
+        ]
+
+    def test_refills_at_rate(self):
+        """Test that tokens come back at the configured rate."""
+        clock = FakeClock()
+        bucket = TokenBucket(2, 1, clock=clock)
+        bucket.try_acquire()
+
+        clock.now = 0.4
+        assert bucket.try_acquire() is False
+        clock.now = 0.6
+        assert bucket.try_acquire() is True
+
+    def test_refill_capped_at_burst(self):
+        """Test that idle time does not build up more than the burst."""
+        clock = FakeClock()
+        bucket = TokenBucket(10, 2, clock=clock)
+        clock.now = 100
+
+        assert [bucket.try_acquire() for _ in range(3)] == [
+            True, True, False
+        ]
+
+    def test_zero_rate_is_unlimited(self):
+        """Test that a rate of 0 disables the limit."""
+        bucket = TokenBucket(0, 1, clock=FakeClock())
+
+        assert all(bucket.try_acquire() for _ in range(100))
+
+
+class TestJitter:
+    """Test cases for jittered and decorrelated_jitter."""
+
+    def test_jittered_within_bounds(self):
+        """Test that the interval stays within +/- jitter."""
+        values = [jittered(10, 0.2) for _ in range(200)]
+
+        assert all(8 <= v <= 12 for v in values)
+        assert len(set(values)) > 1
+
+    def test_decorrelated_jitter_bounds(self):
+        """Test that delays stay between base and 3x previous."""
+        for _ in range(200):
+            delay = decorrelated_jitter(2, 0.5, 30)
+            assert 0.5 <= delay <= 6
+
+    def test_decorrelated_jitter_first_delay(self):
+        """Test that the first delay starts from the base."""
+        for _ in range(200):
+            assert 0.5 <= decorrelated_jitter(0, 0.5, 30) <= 1.5
+
+    @patch("configmap_reader.ratelimit.random.uniform")
+    def test_decorrelated_jitter_capped(self, mock_uniform):
+        """Test that delays never exceed the cap."""
+        mock_uniform.return_value = 100
+
+        assert decorrelated_jitter(50, 0.5, 30) == 30
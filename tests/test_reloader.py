@@ -0,0 +1,163 @@
+import logging
+from unittest.mock import MagicMock
+
+from configmap_reader import metrics
+from configmap_reader.reloader import Reloader
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _reloader(source, clock, **kwargs):
+    build = MagicMock(side_effect=lambda data: dict(data))
+    options = dict(debounce=0.2, max_staleness=1.0, clock=clock)
+    options.update(kwargs)
+    return Reloader(lambda: source["data"], build, **options), build
+
+
+class TestReloaderPoll:
+    """Test cases for debouncing and publishing."""
+
+    def test_first_value_built_immediately(self):
+        """Test that the initial value isn't debounced."""
+        source = {"data": {"v": 1}}
+        reloader, build = _reloader(source, FakeClock())
+
+        assert reloader.poll() is True
+        assert reloader.current == {"v": 1}
+        build.assert_called_once()
+
+    def test_unchanged_source_not_rebuilt(self):
+        """Test that polling an unchanged source doesn't rebuild."""
+        source = {"data": {"v": 1}}
+        clock = FakeClock()
+        reloader, build = _reloader(source, clock)
+        reloader.poll()
+
+        clock.now = 10
+        assert reloader.poll() is False
+        build.assert_called_once()
+
+    def test_burst_debounced_into_one_build(self):
+        """Test that changes within the window cost one rebuild."""
+        source = {"data": {"v": 0}}
+        clock = FakeClock()
+        reloader, build = _reloader(source, clock)
+        reloader.poll()
+
+        for i in range(1, 5):
+            clock.now += 0.1
+            source["data"] = {"v": i}
+            assert reloader.poll() is False
+        assert reloader.current == {"v": 0}
+
+        clock.now += 0.2
+        assert reloader.poll() is True
+        assert reloader.current == {"v": 4}
+        assert build.call_count == 2
+
+    def test_max_staleness_bounds_delay(self):
+        """Test that constant churn still publishes within the bound."""
+        source = {"data": {"v": 0}}
+        clock = FakeClock()
+        reloader, build = _reloader(source, clock)
+        reloader.poll()
+
+        published = []
+        for i in range(1, 30):
+            clock.now = i * 0.1
+            source["data"] = {"v": i}
+            if reloader.poll():
+                published.append(clock.now)
+
+        assert published
+        assert published[0] <= 0.1 + 1.0
+        assert metrics.get("configmap_reader_reload_staleness_seconds") >= 1
+
+    def test_failed_build_keeps_current(self):
+        """Test that a failing build keeps serving the last value."""
+        source = {"data": {"v": 1}}
+        clock = FakeClock()
+        reloader, build = _reloader(source, clock, debounce=0)
+        reloader.poll()
+        build.side_effect = ValueError("broken")
+        errors = metrics.get("configmap_reader_reload_errors_total")
+
+        source["data"] = {"v": 2}
+        assert reloader.poll() is False
+
+        assert reloader.current == {"v": 1}
+        assert metrics.get("configmap_reader_reload_errors_total") == (
+            errors + 1
+        )
+
+    def test_failed_build_retried(self):
+        """Test that a change whose build failed is built on a later poll."""
+        source = {"data": {"v": 1}}
+        reloader, build = _reloader(source, FakeClock(), debounce=0)
+        reloader.poll()
+        build.side_effect = ValueError("broken")
+        source["data"] = {"v": 2}
+        reloader.poll()
+
+        build.side_effect = lambda data: dict(data)
+
+        assert reloader.poll() is True
+        assert reloader.current == {"v": 2}
+
+    def test_failed_read_keeps_current(self):
+        """Test that a failing read keeps serving the last value."""
+        clock = FakeClock()
+        read = MagicMock(return_value={"v": 1})
+        reloader = Reloader(read, dict, clock=clock)
+        reloader.poll()
+        read.side_effect = OSError("gone")
+
+        assert reloader.poll() is False
+        assert reloader.current == {"v": 1}
+
+    def test_failed_reads_logged_on_state_change(self, caplog):
+        """Test that repeated failures are logged once, then recovery."""
+        read = MagicMock(return_value={"v": 1})
+        reloader = Reloader(read, dict, clock=FakeClock())
+        reloader.poll()
+        read.side_effect = OSError("gone")
+
+        for _ in range(5):
+            reloader.poll()
+        read.side_effect = None
+        reloader.poll()
+
+        messages = [
+            record.getMessage() for record in caplog.records
+            if record.levelno >= logging.WARNING
+        ]
+        assert messages == [
+            "Reading the config failed",
+            "Reading the config succeeded again",
+        ]
+
+
+class TestReloaderThread:
+    """Test cases for the background thread."""
+
+    def test_start_publishes_and_stops(self):
+        """Test that the thread publishes the first value."""
+        reloader = Reloader(lambda: {"v": 1}, dict, poll_interval=0.01)
+
+        reloader.start()
+        try:
+            for _ in range(200):
+                if reloader.current is not None:
+                    break
+                reloader._stopped.wait(0.01)
+        finally:
+            reloader.stop()
+
+        assert reloader.current == {"v": 1}
+        assert reloader._thread is None
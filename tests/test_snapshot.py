@@ -0,0 +1,114 @@
+import hashlib
+import sys
+
+import pytest
+
+from configmap_reader.snapshot import (
+    RawData,
+    Snapshot,
+    SnapshotTooLarge,
+    raw_of,
+    version_of,
+)
+
+
+class TestSnapshot:
+    """Test cases for the Snapshot type."""
+
+    def test_from_data_stores_bytes(self):
+        """Test that text values are stored UTF-8 encoded."""
+        snapshot = Snapshot.from_data({"body": "é", "raw": b"\x00"})
+
+        assert snapshot.raw("body") == "é".encode("utf-8")
+        assert snapshot.raw("raw") == b"\x00"
+        assert not snapshot.is_binary("body")
+        assert snapshot.is_binary("raw")
+
+    def test_get_decodes_text(self):
+        """Test that get decodes text and keeps binary values."""
+        snapshot = Snapshot.from_data({"body": "é", "raw": b"\xff"})
+
+        assert snapshot.get("body") == "é"
+        assert snapshot.get("raw") == b"\xff"
+        assert snapshot.get("missing", "x") == "x"
+        assert snapshot.to_dict() == {"body": "é", "raw": b"\xff"}
+
+    def test_version_matches_digests(self):
+        """Test that the version is computed from per-key digests."""
+        snapshot = Snapshot.from_data({"body": "a"})
+
+        digest = hashlib.sha256(b"a").hexdigest()
+        assert snapshot.version == version_of({"body": digest})
+
+    def test_is_immutable(self):
+        """Test that attributes can't be set or deleted."""
+        snapshot = Snapshot.from_data({"body": "a"})
+
+        with pytest.raises(AttributeError):
+            snapshot.version = "x"
+        with pytest.raises(AttributeError):
+            snapshot.extra = 1
+        with pytest.raises(AttributeError):
+            del snapshot.nbytes
+        with pytest.raises(TypeError):
+            snapshot._values["body"] = b"b"
+
+    def test_from_data_shares_unchanged_values(self):
+        """Test that unchanged values reuse the previous bytes object."""
+        previous = Snapshot.from_data({"large": "x" * 1000, "small": "1"})
+
+        snapshot = Snapshot.from_data(
+            {"large": "x" * 1000, "small": "2"}, previous
+        )
+
+        assert snapshot.raw("large") is previous.raw("large")
+        assert snapshot.raw("small") == b"2"
+        assert snapshot.version != previous.version
+
+    def test_from_raw_returns_previous_when_unchanged(self):
+        """Test that equal data gives back the previous snapshot."""
+        data = {"body": "a", "bin": b"\x80"}
+        previous = Snapshot.from_raw(raw_of(data))
+
+        snapshot = Snapshot.from_raw(raw_of(dict(data)), previous)
+
+        assert snapshot is previous
+
+    def test_from_raw_shares_source_bytes(self):
+        """Test that the snapshot keeps the bytes objects it is given."""
+        value = b"x" * 1000
+
+        snapshot = Snapshot.from_raw(RawData({"body": value}))
+
+        assert snapshot.raw("body") is value
+
+    def test_nbytes_grows_with_values(self):
+        """Test that the footprint accounts for stored values."""
+        small = Snapshot.from_data({"body": "a"})
+        large = Snapshot.from_data({"body": "a" * 10000})
+
+        assert large.nbytes - small.nbytes >= 9999
+
+    def test_nbytes_counts_dicts_behind_proxies(self):
+        """Test that the footprint includes the dicts of many keys."""
+        snapshot = Snapshot.from_data({f"key{i}": "" for i in range(1000)})
+        values = dict(snapshot._values)
+        digests = dict(snapshot._digests)
+        items = sum(
+            sys.getsizeof(key) + sys.getsizeof(value)
+            + sys.getsizeof(digests[key])
+            for key, value in values.items()
+        )
+
+        assert snapshot.nbytes >= (
+            items + sys.getsizeof(values) + sys.getsizeof(digests)
+        )
+
+    def test_check_budget(self):
+        """Test that snapshots over the budget are refused."""
+        snapshot = Snapshot.from_data({"body": "a" * 1000})
+
+        snapshot.check_budget(0)
+        snapshot.check_budget(snapshot.nbytes)
+        with pytest.raises(SnapshotTooLarge):
+            snapshot.check_budget(snapshot.nbytes - 1)
@@ -0,0 +1,81 @@
+import json
+import os
+from unittest.mock import patch
+
+from configmap_reader import templating
+
+
+class TestCompile:
+    """Test cases for compiling bodies into templates."""
+
+    def test_static_body_returned_unchanged(self):
+        """Test that a body without placeholders isn't a template."""
+        content = b'{"a":"${unknown.x}"}'
+
+        assert templating.compile(content, json_escape=True) is content
+
+    def test_splits_chunks_and_slots(self):
+        """Test that placeholders become slots between static chunks."""
+        template = templating.compile(
+            b"a ${pod.name} b ${query.x}", json_escape=False
+        )
+
+        assert template.chunks == (b"a ", b" b ", b"")
+        assert template.slots == (("pod", "name"), ("query", "x"))
+
+
+class TestRender:
+    """Test cases for resolving and rendering templates."""
+
+    @patch.dict(
+        os.environ,
+        {"POD_NAME": "pod-1", "POD_NAMESPACE": "ns", "REGION": "eu"},
+    )
+    @patch("configmap_reader.templating.ENV_ALLOWLIST", {"REGION"})
+    def test_resolves_pod_env_and_query(self):
+        """Test that slots are filled from pod, env and query values."""
+        template = templating.compile(
+            b"${pod.name}/${pod.namespace}/${env.REGION}/${query.q}",
+            json_escape=False,
+        )
+
+        values = template.resolve({"q": "v"})
+
+        assert values == ["pod-1", "ns", "eu", "v"]
+        assert template.render(values) == b"pod-1/ns/eu/v"
+
+    def test_missing_values_are_empty(self):
+        """Test that unknown env vars and query params render empty."""
+        template = templating.compile(
+            b"[${env.CONFIGMAP_READER_UNSET}${query.q}${pod.other}]",
+            json_escape=False,
+        )
+
+        assert template.render(template.resolve({})) == b"[]"
+
+    @patch.dict(os.environ, {"REGION": "eu", "SECRET": "s3cr3t"})
+    @patch("configmap_reader.templating.ENV_ALLOWLIST", {"REGION"})
+    def test_env_limited_to_allowlist(self):
+        """Test that variables outside BODY_TEMPLATE_ENV render empty."""
+        template = templating.compile(
+            b"${env.REGION}/${env.SECRET}", json_escape=False
+        )
+
+        assert template.render(template.resolve({})) == b"eu/"
+
+    def test_json_escapes_values(self):
+        """Test that values can't break out of a JSON string."""
+        template = templating.compile(
+            b'{"a":"${query.q}"}', json_escape=True
+        )
+
+        content = template.render(['x", "b": "\\'])
+
+        assert json.loads(content) == {"a": 'x", "b": "\\'}
+
+    def test_fingerprint_differs_per_values(self):
+        """Test that different slot values get different fingerprints."""
+        assert templating.fingerprint(["a"]) != templating.fingerprint(["b"])
+        assert templating.fingerprint(["a", "b"]) != (
+            templating.fingerprint(["ab"])
+        )
@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from configmap_reader import timing
+from configmap_reader.timing import PhaseTimer, log_sampled
+
+
+@pytest.fixture
+def timing_stream():
+    """Capture what the timing logger's own handler writes."""
+    stream = io.StringIO()
+    previous = timing._handler.setStream(stream)
+    yield stream
+    timing._handler.setStream(previous)
+
+
+class TestPhaseTimer:
+    """Test cases for the PhaseTimer class."""
+
+    @patch("configmap_reader.timing.time.perf_counter")
+    def test_mark_records_consecutive_phases(self, mock_clock):
+        """Test that each mark measures time since the previous one."""
+        mock_clock.side_effect = [1.0, 1.002, 1.0025]
+
+        timer = PhaseTimer()
+        timer.mark("read")
+        timer.mark("parse")
+
+        assert timer.as_dict() == {"read": 2.0, "parse": 0.5}
+
+    @patch("configmap_reader.timing.time.perf_counter")
+    def test_header_format(self, mock_clock):
+        """Test Server-Timing header rendering with descriptions."""
+        mock_clock.side_effect = [0.0, 0.001, 0.003]
+
+        timer = PhaseTimer()
+        timer.mark("read", desc="api")
+        timer.mark("encode")
+
+        assert timer.header() == 'read;desc="api";dur=1.000, encode;dur=2.000'
+
+    def test_header_empty(self):
+        """Test header of a timer without phases."""
+        assert PhaseTimer().header() == ""
+
+
+class TestLogSampled:
+    """Test cases for the log_sampled function."""
+
+    def test_log_sampled_disabled(self, timing_stream):
+        """Test that nothing is logged with a zero sample rate."""
+        assert log_sampled(PhaseTimer(), 0.0) is False
+
+        assert timing_stream.getvalue() == ""
+
+    def test_log_sampled_writes_json(self, timing_stream):
+        """Test that sampled lines are structured JSON."""
+        timer = PhaseTimer()
+        timer.mark("read")
+
+        assert log_sampled(timer, 1.0, path="/config") is True
+
+        record = json.loads(timing_stream.getvalue())
+        assert record["path"] == "/config"
+        assert set(record["phases_ms"]) == {"read"}
+        assert "total_ms" in record
+
+    def test_log_sampled_written_with_warning_root(self, timing_stream):
+        """Test that lines are written when the root level is WARNING."""
+        root = logging.getLogger()
+        level = root.level
+        root.setLevel(logging.WARNING)
+        try:
+            log_sampled(PhaseTimer(), 1.0, path="/config")
+        finally:
+            root.setLevel(level)
+
+        assert json.loads(timing_stream.getvalue())["path"] == "/config"
+
+    @patch("configmap_reader.timing.random.random")
+    def test_log_sampled_respects_rate(self, mock_random):
+        """Test that requests above the sample rate are skipped."""
+        mock_random.return_value = 0.5
+
+        assert log_sampled(PhaseTimer(), 0.1) is False
+        assert log_sampled(PhaseTimer(), 0.9) is True